@@ -9,10 +9,38 @@ from .pubmed_oa_parser import list_xml_path, \
                               parse_pubmed_references, \
                               parse_pubmed_paragraph, \
                               parse_pubmed_caption, \
-                              parse_pubmed_table
+                              parse_pubmed_table, \
+                              OAArticle, \
+                              iter_oa_tarball
 from .medline_parser import parse_medline_xml, \
+                            iter_medline_xml, \
+                            parse_medline_tables, \
+                            parse_medline_columns, \
+                            iter_medline_batches, \
+                            parse_medline_dir, \
                             parse_medline_grant_id
 from .pubmed_web_parser import parse_xml_web, \
+                               parse_xml_web_batch, \
                                parse_citation_web, \
-                               parse_outgoing_citation_web
+                               iter_citation_web, \
+                               parse_outgoing_citation_web, \
+                               aparse_xml_web, \
+                               aparse_citation_web, \
+                               aparse_outgoing_citation_web
+from .web_client import WebClient, get_web_client, set_web_client
+from .web_cache import ResponseCache
+from .medline_store import MedlineStore
+from .compaction import compact_medline
+from .citation_graph import build_citation_graph, \
+                             load_citation_graph
+from .index import MedlineIndex, \
+                    build_medline_index, \
+                    get_medline_citation, \
+                    OAIndex, \
+                    build_oa_index, \
+                    get_oa_article
+from .writers import JSONLWriter, \
+                      ParquetWriter, \
+                      write_records, \
+                      record_to_json
 from .utils import pretty_print
\ No newline at end of file
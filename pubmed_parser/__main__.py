@@ -0,0 +1,228 @@
+"""
+Command line interface for pubmed_parser
+
+Example
+-------
+    python -m pubmed_parser medline ~/Downloads/medline --n-jobs 8 -o out/medline --format parquet
+    python -m pubmed_parser oa ~/Downloads/pubmed_oa --n-jobs 8 -o out/pubmed_oa
+    python -m pubmed_parser oa ~/Downloads/non_comm_use.A-B.xml.tar.gz --n-jobs 8 -o out/pubmed_oa
+    python -m pubmed_parser update medline.db ~/Downloads/medline
+    python -m pubmed_parser index medline_index.db ~/Downloads/medline
+    python -m pubmed_parser oa-index oa_index.db ~/Downloads/non_comm_use.A-B.xml.tar.gz
+    python -m pubmed_parser compact ~/Downloads/medline -o out/medline_snapshot --format parquet
+    python -m pubmed_parser citations ~/Downloads/non_comm_use.A-B.xml.tar.gz -o out/citation_graph
+"""
+import os
+import sys
+import argparse
+from functools import partial
+from .medline_parser import parse_medline_dir, list_medline_path
+from .pubmed_oa_parser import list_xml_path, parse_pubmed_xml, iter_oa_tarball
+from .utils import imap_bounded
+from .medline_store import MedlineStore
+from .index import MedlineIndex, OAIndex
+from .compaction import compact_medline
+from .citation_graph import build_citation_graph
+from .writers import JSONLWriter, ParquetWriter, record_to_json
+
+
+class _StdoutWriter(object):
+    """Write records as JSON lines to standard output"""
+    def write_many(self, records):
+        for record in records:
+            sys.stdout.write(record_to_json(record) + '\n')
+
+    def close(self):
+        sys.stdout.flush()
+
+
+def _open_writer(args):
+    if args.output is None:
+        return _StdoutWriter()
+    max_file_size = args.max_file_size * 1024 ** 2 if args.max_file_size else None
+    if args.format == 'parquet':
+        return ParquetWriter(args.output, max_file_size=max_file_size)
+    return JSONLWriter(args.output, max_file_size=max_file_size)
+
+
+def _add_file_name(records, path):
+    file_name = os.path.basename(path)
+    for record in records:
+        record['file_name'] = file_name
+        yield record
+
+
+def medline(args):
+    """Parse a directory of MEDLINE files"""
+    fields = args.fields.split(',') if args.fields else None
+    writer = _open_writer(args)
+    try:
+        for path, article_list in parse_medline_dir(args.path, n_jobs=args.n_jobs,
+                                                    ordered=not args.unordered,
+                                                    max_pending=args.max_pending,
+                                                    year_info_only=not args.full_date,
+                                                    fields=fields):
+            writer.write_many(_add_file_name(article_list, path))
+    finally:
+        writer.close()
+
+
+def oa(args):
+    """Parse a directory of PubMed Open-Access XML files or a bulk tar.gz archive"""
+    fields = args.fields.split(',') if args.fields else None
+    if os.path.isfile(args.path):
+        articles = iter_oa_tarball(args.path, n_jobs=args.n_jobs, ordered=not args.unordered,
+                                   max_pending=args.max_pending, fields=fields)
+    else:
+        parse_file = partial(parse_pubmed_xml, fields=fields)
+        articles = imap_bounded(parse_file, list_xml_path(args.path), n_jobs=args.n_jobs,
+                                ordered=not args.unordered, max_pending=args.max_pending)
+    writer = _open_writer(args)
+    try:
+        for path, article in articles:
+            writer.write_many(_add_file_name([article], path))
+    finally:
+        writer.close()
+
+
+def update(args):
+    """Apply new MEDLINE baseline or update files to a local PMID-keyed store"""
+    with MedlineStore(args.store) as store:
+        for path in list_medline_path(args.path):
+            if store.apply_file(path, year_info_only=not args.full_date):
+                print('Applied %s' % path)
+        print('%d citations in %s' % (len(store), args.store))
+
+
+def index(args):
+    """Index PMIDs of MEDLINE files for random access"""
+    with MedlineIndex(args.index, spacing=args.spacing * 1024) as medline_index:
+        for path in list_medline_path(args.path):
+            medline_index.add_file(path)
+            print('Indexed %s' % path)
+
+
+def oa_index(args):
+    """Index PMC IDs of PubMed Open-Access bulk archives for random access"""
+    with OAIndex(args.index, spacing=args.spacing * 1024) as index:
+        for path in args.path:
+            index.add_archive(path)
+            print('Indexed %s' % path)
+
+
+def compact(args):
+    """Write the last version of each MEDLINE citation across baseline and update files"""
+    fields = args.fields.split(',') if args.fields else None
+    max_file_size = args.max_file_size * 1024 ** 2 if args.max_file_size else None
+    paths = compact_medline(args.path, args.output, output_format=args.format,
+                            run_size=args.run_size, tmp_dir=args.tmp_dir, n_jobs=args.n_jobs,
+                            writer_kwargs={'max_file_size': max_file_size},
+                            year_info_only=not args.full_date, fields=fields)
+    for path in paths:
+        print('Wrote %s' % path)
+
+
+def citations(args):
+    """Build the citation graph of PubMed Open-Access articles as CSR arrays"""
+    n_nodes, n_edges = build_citation_graph(args.path, args.output, n_jobs=args.n_jobs,
+                                            max_pending=args.max_pending)
+    print('Wrote %d articles and %d citations to %s' % (n_nodes, n_edges, args.output))
+
+
+def _add_common_arguments(parser):
+    parser.add_argument('-o', '--output',
+                        help='prefix of output files, e.g. out/medline, defaults to JSON lines on stdout')
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl',
+                        help='output format, gzipped JSON lines or Parquet')
+    parser.add_argument('--max-file-size', type=int, default=512,
+                        help='size in MB after which a new output file is started')
+    parser.add_argument('--n-jobs', type=int, default=None,
+                        help='number of processes, defaults to the number of CPUs')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write files as soon as they are parsed instead of in order')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='maximum number of parsed files held in memory')
+    parser.add_argument('--fields', help='comma separated fields to extract, defaults to all')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pubmed_parser',
+                                     description='Parse PubMed Open-Access and MEDLINE XML')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    medline_parser = subparsers.add_parser('medline', help=medline.__doc__)
+    medline_parser.add_argument('path', help='directory of MEDLINE .xml.gz files')
+    _add_common_arguments(medline_parser)
+    medline_parser.add_argument('--full-date', action='store_true',
+                                help='parse month and day of publication date, not only year')
+    medline_parser.set_defaults(func=medline)
+
+    oa_parser = subparsers.add_parser('oa', help=oa.__doc__)
+    oa_parser.add_argument('path', help='directory of PubMed Open-Access .nxml files or bulk .tar.gz archive')
+    _add_common_arguments(oa_parser)
+    oa_parser.set_defaults(func=oa)
+
+    update_parser = subparsers.add_parser('update', help=update.__doc__)
+    update_parser.add_argument('store', help='path to the SQLite store, created if it does not exist')
+    update_parser.add_argument('path', help='directory of MEDLINE .xml.gz files')
+    update_parser.add_argument('--full-date', action='store_true',
+                               help='parse month and day of publication date, not only year')
+    update_parser.set_defaults(func=update)
+
+    index_parser = subparsers.add_parser('index', help=index.__doc__)
+    index_parser.add_argument('index', help='path to the SQLite index, created if it does not exist')
+    index_parser.add_argument('path', help='directory of MEDLINE .xml.gz files')
+    index_parser.add_argument('--spacing', type=int, default=1024,
+                              help='distance in KB of uncompressed data between gzip access points')
+    index_parser.set_defaults(func=index)
+
+    oa_index_parser = subparsers.add_parser('oa-index', help=oa_index.__doc__)
+    oa_index_parser.add_argument('index', help='path to the SQLite index, created if it does not exist')
+    oa_index_parser.add_argument('path', nargs='+', help='bulk .tar.gz archives, later ones take precedence')
+    oa_index_parser.add_argument('--spacing', type=int, default=1024,
+                                 help='distance in KB of uncompressed data between gzip access points')
+    oa_index_parser.set_defaults(func=oa_index)
+
+    compact_parser = subparsers.add_parser('compact', help=compact.__doc__)
+    compact_parser.add_argument('path', help='directory of MEDLINE baseline and update .xml.gz files')
+    compact_parser.add_argument('-o', '--output', required=True,
+                                help='prefix of output files, e.g. out/medline_snapshot')
+    compact_parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl',
+                                help='output format, gzipped JSON lines or Parquet')
+    compact_parser.add_argument('--max-file-size', type=int, default=512,
+                                help='size in MB after which a new output file is started')
+    compact_parser.add_argument('--n-jobs', type=int, default=None,
+                                help='number of processes, defaults to the number of CPUs')
+    compact_parser.add_argument('--run-size', type=int, default=500000,
+                                help='number of citations sorted in memory before spilling to disk')
+    compact_parser.add_argument('--tmp-dir', default=None,
+                                help='directory of temporary sorted runs, defaults to the system one')
+    compact_parser.add_argument('--fields', help='comma separated fields to extract, defaults to all')
+    compact_parser.add_argument('--full-date', action='store_true',
+                                help='parse month and day of publication date, not only year')
+    compact_parser.set_defaults(func=compact)
+
+    citations_parser = subparsers.add_parser('citations', help=citations.__doc__)
+    citations_parser.add_argument('path', help='directory of PubMed Open-Access .nxml files or bulk .tar.gz archive')
+    citations_parser.add_argument('-o', '--output', required=True,
+                                  help='output directory of indptr.npy, indices.npy and nodes.txt')
+    citations_parser.add_argument('--n-jobs', type=int, default=None,
+                                  help='number of processes, defaults to the number of CPUs')
+    citations_parser.add_argument('--max-pending', type=int, default=None,
+                                  help='maximum number of parsed articles held in memory')
+    citations_parser.set_defaults(func=citations)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # output closed early, e.g. piped to `head`: stop without a traceback,
+        # and point stdout to devnull so that flushing it at exit does not fail
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
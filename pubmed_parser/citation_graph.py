@@ -0,0 +1,137 @@
+"""
+Citation graph of a PubMed Open-Access corpus as CSR arrays
+"""
+import os
+import io
+from array import array
+import numpy as np
+from .utils import read_xml, imap_bounded
+from .pubmed_oa_parser import list_xml_path, iter_oa_tarball, parse_article_meta, _parse_references_tree
+
+__all__ = [
+    'build_citation_graph',
+    'load_citation_graph'
+]
+
+
+def _pmid_key(pmid):
+    pmid = (pmid or '').strip()
+    return 'pmid:' + pmid if pmid else None
+
+
+def _doi_key(doi):
+    doi = (doi or '').strip().lower()
+    return 'doi:' + doi if doi else None
+
+
+def article_citations(path):
+    """
+    Citing article and cited articles of one Open-Access article
+
+    Articles are keyed by 'pmid:<PMID>' if they have one, otherwise by
+    'doi:<lowercased DOI>'. Citing articles without either are keyed by
+    'pmc:<PMC ID>'. References with neither PMID nor DOI are left out.
+
+    Parameters
+    ----------
+    path: str, bytes or file object, see `read_xml`
+
+    Returns
+    -------
+    (citing, cited): tuple of the key of the article and the list of
+        unique keys of the articles it cites, in reference order
+    """
+    tree = read_xml(path)
+    dict_article_meta = parse_article_meta(tree)
+    citing = (_pmid_key(dict_article_meta['pmid']) or _doi_key(dict_article_meta['doi']) or
+              'pmc:' + dict_article_meta['pmc'])
+    cited = list()
+    for reference in _parse_references_tree(tree, dict_article_meta) or []:
+        key = _pmid_key(reference['pmid_cited']) or _doi_key(reference['doi_cited'])
+        if key is not None:
+            cited.append(key)
+    return citing, list(dict.fromkeys(cited))
+
+
+def build_citation_graph(path, output_dir, n_jobs=1, max_pending=None):
+    """
+    Build the citing -> cited graph of an Open-Access corpus
+
+    References are extracted from every article and each PMID or DOI
+    (see `article_citations`) is mapped to an integer node ID. Edges are
+    kept in compact integer arrays, never as Python objects, and written
+    in compressed sparse row (CSR) form: cited nodes of node `i` are
+    `indices[indptr[i]:indptr[i + 1]]`.
+
+    Parameters
+    ----------
+    path: str or list, directory of `.nxml` files, bulk `.tar.gz` archive
+        (see `iter_oa_tarball`) or list of paths to `.nxml` files
+    output_dir: str, directory to write, created if it does not exist
+        - `indptr.npy`: int64 array of length `n_nodes + 1`
+        - `indices.npy`: int32 array, or int64 for more than 2**31 nodes,
+          of cited node IDs
+        - `nodes.txt`: key of node `i` on line `i`, e.g. 'pmid:17299597'
+    n_jobs: int, default 1, number of processes extracting references,
+        None for the number of CPUs
+    max_pending: int, see `imap_bounded`
+
+    Returns
+    -------
+    (n_nodes, n_edges): tuple, size of the graph
+    """
+    if isinstance(path, str) and os.path.isfile(path):
+        results = iter_oa_tarball(path, parser=article_citations, n_jobs=n_jobs, max_pending=max_pending)
+    else:
+        paths = list_xml_path(path) if isinstance(path, str) else path
+        results = imap_bounded(article_citations, paths, n_jobs=n_jobs, max_pending=max_pending)
+
+    node_ids = dict()
+    sources = array('q')
+    targets = array('q')
+    for _, (citing, cited) in results:
+        source = node_ids.setdefault(citing, len(node_ids))
+        for key in cited:
+            sources.append(source)
+            targets.append(node_ids.setdefault(key, len(node_ids)))
+
+    n_nodes = len(node_ids)
+    sources = np.frombuffer(sources, dtype=np.int64) if sources else np.zeros(0, dtype=np.int64)
+    targets = np.frombuffer(targets, dtype=np.int64) if targets else np.zeros(0, dtype=np.int64)
+    order = np.argsort(sources, kind='stable')
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=indptr[1:])
+    index_dtype = np.int32 if n_nodes < 2 ** 31 else np.int64
+    indices = targets[order].astype(index_dtype)
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    np.save(os.path.join(output_dir, 'indptr.npy'), indptr)
+    np.save(os.path.join(output_dir, 'indices.npy'), indices)
+    with io.open(os.path.join(output_dir, 'nodes.txt'), 'w', encoding='utf-8') as f:
+        for key in node_ids:
+            f.write(key.replace('\n', ' ') + '\n')
+    return n_nodes, len(indices)
+
+
+def load_citation_graph(output_dir, mmap=True):
+    """
+    Load a graph written by `build_citation_graph`
+
+    Parameters
+    ----------
+    output_dir: str, directory given to `build_citation_graph`
+    mmap: bool, if True memory-map the arrays instead of reading them
+
+    Returns
+    -------
+    (indptr, indices, nodes): CSR arrays and list of node keys. With scipy,
+        `scipy.sparse.csr_matrix((np.ones(len(indices)), indices, indptr),
+        shape=(len(nodes), len(nodes)))` is the adjacency matrix
+    """
+    mmap_mode = 'r' if mmap else None
+    indptr = np.load(os.path.join(output_dir, 'indptr.npy'), mmap_mode=mmap_mode)
+    indices = np.load(os.path.join(output_dir, 'indices.npy'), mmap_mode=mmap_mode)
+    with io.open(os.path.join(output_dir, 'nodes.txt'), encoding='utf-8') as f:
+        nodes = [line.rstrip('\n') for line in f]
+    return indptr, indices, nodes
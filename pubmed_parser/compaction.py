@@ -0,0 +1,138 @@
+"""
+Compaction of MEDLINE baseline and update files into a snapshot holding
+the last version of each citation, using an external merge sort
+"""
+import os
+import heapq
+import pickle
+import shutil
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from .medline_parser import parse_medline_dir, list_medline_path
+from .writers import JSONLWriter, ParquetWriter
+
+__all__ = [
+    'compact_medline'
+]
+
+
+_sort_key = itemgetter(0, 1, 2)
+
+
+def _pmid_key(pmid):
+    """Sort PMIDs numerically, the few that are not numbers go last"""
+    try:
+        return (0, int(pmid), '')
+    except (TypeError, ValueError):
+        return (1, 0, pmid or '')
+
+
+def _write_run(rows, tmp_dir, n_runs):
+    """Sort rows in memory and spill them to a run file"""
+    rows.sort(key=_sort_key)
+    run_path = os.path.join(tmp_dir, 'run-%05d.pkl' % n_runs)
+    with open(run_path, 'wb', buffering=1024 ** 2) as f:
+        for row in rows:
+            pickle.dump(row, f, pickle.HIGHEST_PROTOCOL)
+    return run_path
+
+
+def _read_run(run_path):
+    with open(run_path, 'rb', buffering=1024 ** 2) as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _spill_runs(paths, tmp_dir, run_size, n_jobs, **kwargs):
+    """
+    Parse files and write sorted runs of rows
+    (pmid key, file sequence, position in file, record or None if deleted)
+    """
+    file_sequence = {path: i for i, path in enumerate(paths)}
+    run_paths = list()
+    rows = list()
+    for path, article_list in parse_medline_dir(paths, n_jobs=n_jobs, **kwargs):
+        seq = file_sequence[path]
+        file_name = os.path.basename(path)
+        for position, article in enumerate(article_list):
+            if article['delete']:
+                record = None
+            else:
+                record = article
+                record['file_name'] = file_name
+            rows.append((_pmid_key(article['pmid']), seq, position, record))
+            if len(rows) >= run_size:
+                run_paths.append(_write_run(rows, tmp_dir, len(run_paths)))
+                rows = list()
+    if rows:
+        run_paths.append(_write_run(rows, tmp_dir, len(run_paths)))
+    return run_paths
+
+
+def _latest_versions(run_paths):
+    """K-way merge of runs keeping the last version of each PMID if it is not deleted"""
+    merged = heapq.merge(*[_read_run(p) for p in run_paths], key=_sort_key)
+    for _, versions in groupby(merged, key=itemgetter(0)):
+        for row in versions:
+            pass
+        record = row[3]
+        if record is not None:
+            yield record
+
+
+def compact_medline(path, path_prefix, output_format='jsonl', run_size=500000,
+                    tmp_dir=None, n_jobs=None, writer_kwargs=None, **kwargs):
+    """
+    Write the last version of each MEDLINE citation, sorted by PMID
+
+    Files are parsed in release order (file name order). Citations are
+    spilled to temporary runs of `run_size` citations sorted by
+    (PMID, file sequence) and the runs are merged. Only the last version
+    of each PMID is written, and nothing is written for deleted PMIDs.
+    Memory use is bounded by `run_size` and disk is read and written
+    sequentially.
+
+    Parameters
+    ----------
+    path: str or list, directory of MEDLINE baseline and update files
+        or list of paths
+    path_prefix: str, prefix of output files, e.g. 'out/medline_snapshot'
+    output_format: str, 'jsonl' or 'parquet'
+    run_size: int, number of citations held in memory before a run is spilled
+    tmp_dir: str, directory for temporary runs, defaults to the system one.
+        It needs about as much space as the uncompressed parsed citations
+    n_jobs: int, number of processes parsing files, see `parse_medline_dir`
+    writer_kwargs: dict, passed to `JSONLWriter` or `ParquetWriter`
+    kwargs: passed to `parse_medline_xml`, such as `year_info_only` or `fields`
+
+    Returns
+    -------
+    paths: list, paths of the written files. Records have the fields of
+        `parse_medline_xml` and `file_name`, the file of their last version
+
+    Example
+    -------
+    >> pp.compact_medline('~/Downloads/medline', 'out/medline_snapshot',
+    >>                    output_format='parquet', n_jobs=8)
+    """
+    if output_format == 'jsonl':
+        writer = JSONLWriter(path_prefix, **(writer_kwargs or {}))
+    elif output_format == 'parquet':
+        writer = ParquetWriter(path_prefix, **(writer_kwargs or {}))
+    else:
+        raise ValueError('Give output_format from jsonl or parquet')
+    if kwargs.get('fields') is not None:
+        kwargs['fields'] = sorted(set(kwargs['fields']) | {'pmid', 'delete'})
+    paths = list_medline_path(path) if isinstance(path, str) else sorted(path, key=os.path.basename)
+    run_dir = tempfile.mkdtemp(prefix='medline_runs-', dir=tmp_dir)
+    try:
+        run_paths = _spill_runs(paths, run_dir, run_size, n_jobs, **kwargs)
+        with writer:
+            writer.write_many(_latest_versions(run_paths))
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return writer.paths
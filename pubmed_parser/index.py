@@ -0,0 +1,455 @@
+"""
+Random access to single records inside compressed MEDLINE files and
+PubMed Open-Access bulk archives
+
+An index records, for every PMID or PMC ID, the file and uncompressed
+byte range of its XML together with gzip access points (see zran.c
+in zlib) so a lookup only decompresses a small window of the file.
+Access points require indexed_gzip, without it lookups fall back to
+decompressing the file from its start, which still skips XML parsing.
+"""
+import io
+import os
+import re
+import gzip
+import sqlite3
+import tarfile
+import warnings
+from collections import OrderedDict
+from lxml import etree
+try:
+    import indexed_gzip
+except ImportError:
+    indexed_gzip = None
+from .medline_parser import list_medline_path, parse_article_info
+from .pubmed_oa_parser import parse_pubmed_xml
+from .utils import is_gzip
+
+__all__ = [
+    'MedlineIndex',
+    'build_medline_index',
+    'get_medline_citation',
+    'OAIndex',
+    'build_oa_index',
+    'get_oa_article'
+]
+
+
+# indexed files with their gzip access points, shared by all indexes
+_FILES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    gzip_index BLOB
+);
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS citations (
+    pmid TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    offset INTEGER,
+    length INTEGER
+) WITHOUT ROWID;
+"""
+
+_OA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS oa_articles (
+    pmc TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    member TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# keep the citation from the latest file, deleted citations have no offset
+_UPSERT = """
+INSERT INTO citations (pmid, file_name, offset, length) VALUES (?, ?, ?, ?)
+ON CONFLICT (pmid) DO UPDATE SET
+    file_name = excluded.file_name,
+    offset = excluded.offset,
+    length = excluded.length
+WHERE excluded.file_name >= citations.file_name
+"""
+
+_RECORD_START = re.compile(br'<(MedlineCitation|DeleteCitation)[\s>]')
+_PMID = re.compile(br'<PMID[^>]*>\s*(\d+)\s*</PMID>')
+_PMC = re.compile(br'<article-id[^>]*pub-id-type="pmc(?:id)?"[^>]*>\s*(?:PMC)?(\d+)\s*</article-id>')
+_PMC_NAME = re.compile(r'PMC(\d+)')
+
+
+def open_seekable(path, gzip_index=None, spacing=1024 ** 2):
+    """
+    Open a file, gzipped or not, for random access
+
+    Parameters
+    ----------
+    path: str, path to the file
+    gzip_index: bytes, access points exported from a previous
+        `indexed_gzip.IndexedGzipFile`, if any
+    spacing: int, distance in uncompressed bytes between access points
+        created while reading a gzipped file
+
+    Returns
+    -------
+    f: binary file object supporting `seek`
+    """
+    if not is_gzip(path):
+        return open(path, 'rb')
+    if indexed_gzip is None:
+        return gzip.open(path, 'rb')
+    f = indexed_gzip.IndexedGzipFile(path, spacing=spacing)
+    if gzip_index is not None:
+        f.import_index(fileobj=io.BytesIO(gzip_index))
+    return f
+
+
+def export_gzip_index(f):
+    """Access points of a file opened by `open_seekable` as bytes, None if not available"""
+    if indexed_gzip is None or not isinstance(f, indexed_gzip.IndexedGzipFile):
+        return None
+    buf = io.BytesIO()
+    f.export_index(fileobj=buf)
+    return buf.getvalue()
+
+
+def scan_medline_records(f, chunk_size=1024 ** 2):
+    """
+    Scan a MEDLINE XML stream for citations without parsing the XML
+
+    Parameters
+    ----------
+    f: binary file object of the uncompressed XML
+    chunk_size: int, number of bytes read at once
+
+    Yields
+    ------
+    (pmid, offset, length): tuple of PMID and uncompressed byte range of its
+        `MedlineCitation`. PMIDs under `DeleteCitation` have offset and length None
+    """
+    buf = b''
+    base = 0  # offset of buf[0] in the stream
+    eof = False
+    while not eof:
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+        pos = 0
+        while True:
+            match = _RECORD_START.search(buf, pos)
+            if match is None:
+                # keep enough bytes to match a start tag cut by the chunk
+                pos = max(pos, len(buf) - len('<MedlineCitation>'))
+                break
+            end_tag = b'</' + match.group(1) + b'>'
+            end = buf.find(end_tag, match.end())
+            if end < 0:
+                pos = match.start()
+                break
+            end += len(end_tag)
+            if match.group(1) == b'MedlineCitation':
+                pmid = _PMID.search(buf, match.start(), end).group(1).decode()
+                yield pmid, base + match.start(), end - match.start()
+            else:
+                for pmid in _PMID.findall(buf, match.start(), end):
+                    yield pmid.decode(), None, None
+            pos = end
+        base += pos
+        buf = buf[pos:]
+
+
+class _FileIndex(object):
+    """
+    Base of indexes of records in local files, keeping the gzip access
+    points of files in the `files` table and the `max_open_files` most
+    recently read files opened for lookups
+    """
+    _schema = ''
+
+    def __init__(self, path, spacing=1024 ** 2, max_open_files=8):
+        self.path = path
+        self.spacing = spacing
+        self.max_open_files = max_open_files
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_FILES_SCHEMA + self._schema)
+        self._files = OrderedDict()
+        if indexed_gzip is None:
+            warnings.warn('indexed_gzip is not installed, lookups in gzipped files decompress them '
+                          'from their start. Install it with `pip install indexed_gzip`', stacklevel=2)
+
+    def _add_file(self, file_name, path, f):
+        """Record path and access points of a file read through `open_seekable`"""
+        self.connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)',
+                                (file_name, path, export_gzip_index(f)))
+
+    def _open_file(self, file_name):
+        if file_name in self._files:
+            self._files.move_to_end(file_name)
+            return self._files[file_name]
+        # close least recently read files, with their access points in memory
+        while self._files and len(self._files) >= self.max_open_files:
+            self._files.popitem(last=False)[1].close()
+        path, gzip_index = self.connection.execute(
+            'SELECT path, gzip_index FROM files WHERE file_name = ?', (file_name,)).fetchone()
+        f = open_seekable(path, gzip_index)
+        self._files[file_name] = f
+        return f
+
+    def _close_file(self, file_name):
+        f = self._files.pop(file_name, None)
+        if f is not None:
+            f.close()
+
+    def _read(self, file_name, offset, length):
+        f = self._open_file(file_name)
+        f.seek(offset)
+        return f.read(length)
+
+    def close(self):
+        for file_name in list(self._files):
+            self._close_file(file_name)
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MedlineIndex(_FileIndex):
+    """
+    Index of PMIDs to their position in local MEDLINE files
+
+    Parameters
+    ----------
+    path: str, path to the SQLite index, created if it does not exist
+    spacing: int, distance in uncompressed bytes between gzip access points.
+        Smaller spacing means less data to decompress per lookup but a
+        larger index, each access point takes 32 KB
+    max_open_files: int, number of files kept opened between lookups,
+        each holding its access points in memory
+
+    Example
+    -------
+    >> with MedlineIndex('medline_index.db') as index:
+    >>     index.add_dir('~/Downloads/medline')
+    >>     article = index.get('17942999')
+    """
+    _schema = _SCHEMA
+
+    def add_file(self, path):
+        """Index all citations of one MEDLINE file, compressed or not"""
+        path = os.path.abspath(os.path.expanduser(path))
+        file_name = os.path.basename(path)
+        with open_seekable(path, spacing=self.spacing) as f, self.connection:
+            rows = ((pmid, file_name, offset, length)
+                    for pmid, offset, length in scan_medline_records(f))
+            self.connection.executemany(_UPSERT, rows)
+            self._add_file(file_name, path, f)
+        self._close_file(file_name)
+
+    def add_dir(self, path_dir):
+        """Index all MEDLINE files under `path_dir` in file name order"""
+        for path in list_medline_path(path_dir):
+            self.add_file(path)
+
+    def get_xml(self, pmid):
+        """Raw XML bytes of the `MedlineCitation` of `pmid`, None if deleted or unknown"""
+        row = self.connection.execute('SELECT file_name, offset, length FROM citations WHERE pmid = ?',
+                                      (str(pmid),)).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return self._read(*row)
+
+    def get(self, pmid, year_info_only=True, nlm_category=False, subscpt=None, supscpt=None, fields=None):
+        """
+        Parse the last indexed version of a citation
+
+        Returns
+        -------
+        article: dict, see `parse_article_info`, None if deleted or unknown
+        """
+        xml = self.get_xml(pmid)
+        if xml is None:
+            return None
+        medline = etree.fromstring(xml)
+        return parse_article_info(medline, year_info_only, nlm_category, subscpt, supscpt, fields=fields)
+
+    def __contains__(self, pmid):
+        row = self.connection.execute('SELECT offset FROM citations WHERE pmid = ?', (str(pmid),)).fetchone()
+        return row is not None and row[0] is not None
+
+
+def build_medline_index(path, index_path, spacing=1024 ** 2):
+    """
+    Build an index of PMIDs over MEDLINE files
+
+    Parameters
+    ----------
+    path: str or list, directory of MEDLINE files or list of paths
+    index_path: str, path to the SQLite index to create or extend
+    spacing: int, see `MedlineIndex`
+
+    Returns
+    -------
+    index: MedlineIndex
+    """
+    index = MedlineIndex(index_path, spacing=spacing)
+    paths = list_medline_path(path) if isinstance(path, str) else sorted(path, key=os.path.basename)
+    for p in paths:
+        index.add_file(p)
+    return index
+
+
+def get_medline_citation(pmid, index, **kwargs):
+    """
+    Parse a single MEDLINE citation using an index built by `build_medline_index`
+
+    Parameters
+    ----------
+    pmid: str or int, PubMed ID
+    index: str or MedlineIndex, path to the index or an opened index.
+        Keep the index opened for many lookups
+    kwargs: passed to `parse_article_info`, such as `year_info_only`
+
+    Returns
+    -------
+    article: dict, see `parse_article_info`, None if deleted or unknown
+    """
+    if isinstance(index, MedlineIndex):
+        return index.get(pmid, **kwargs)
+    with MedlineIndex(index) as medline_index:
+        return medline_index.get(pmid, **kwargs)
+
+
+def _member_pmc(name, data):
+    """PMC ID of a tar member from its article-id, or from its name if missing"""
+    match = _PMC.search(data)
+    if match is not None:
+        return match.group(1).decode()
+    match = _PMC_NAME.search(os.path.basename(name))
+    return match.group(1) if match is not None else None
+
+
+def _normalize_pmc(pmc):
+    return str(pmc).strip().upper().replace('PMC', '')
+
+
+class OAIndex(_FileIndex):
+    """
+    Index of PMC IDs to their member in PubMed Open-Access bulk archives
+
+    For every `.nxml` member it records the archive and the position of
+    the member data in the uncompressed tar stream. With the gzip access
+    points of the archive, getting an article only decompresses a window
+    of `spacing` bytes around it.
+
+    Parameters
+    ----------
+    path: str, path to the SQLite index, created if it does not exist
+    spacing: int, distance in uncompressed bytes between gzip access points,
+        see `MedlineIndex`
+    max_open_files: int, see `MedlineIndex`
+
+    Example
+    -------
+    >> with OAIndex('oa_index.db') as index:
+    >>     index.add_archive('~/Downloads/non_comm_use.A-B.xml.tar.gz')
+    >>     article = index.get('PMC2599765')
+    """
+    _schema = _OA_SCHEMA
+
+    def add_archive(self, path):
+        """Index all `.nxml` members of a tar archive, gzipped or not"""
+        path = os.path.abspath(os.path.expanduser(path))
+        file_name = os.path.basename(path)
+        with open_seekable(path, spacing=self.spacing) as f, self.connection:
+            rows = list()
+            with tarfile.open(fileobj=f, mode='r|') as tar:
+                for member in tar:
+                    if not member.isfile() or os.path.splitext(member.name)[-1] not in ('.nxml', '.xml'):
+                        continue
+                    pmc = _member_pmc(member.name, tar.extractfile(member).read())
+                    if pmc is not None:
+                        rows.append((pmc, file_name, member.name, member.offset_data, member.size))
+            self.connection.executemany('INSERT OR REPLACE INTO oa_articles VALUES (?, ?, ?, ?, ?)', rows)
+            self._add_file(file_name, path, f)
+        self._close_file(file_name)
+
+    def get_xml(self, pmc):
+        """Raw XML bytes of the article with PMC ID `pmc`, e.g. 'PMC2599765' or 2599765, None if unknown"""
+        row = self.connection.execute('SELECT file_name, offset, length FROM oa_articles WHERE pmc = ?',
+                                      (_normalize_pmc(pmc),)).fetchone()
+        if row is None:
+            return None
+        return self._read(*row)
+
+    def get(self, pmc, parser=parse_pubmed_xml, **kwargs):
+        """
+        Parse an indexed article
+
+        Parameters
+        ----------
+        pmc: str or int, PMC ID
+        parser: callable, OA parser given the article as bytes, such as
+            `parse_pubmed_xml` or `parse_pubmed_references`
+        kwargs: passed to `parser`
+
+        Returns
+        -------
+        article: output of `parser`, None if the article is not indexed
+        """
+        xml = self.get_xml(pmc)
+        if xml is None:
+            return None
+        return parser(xml, **kwargs)
+
+    def __contains__(self, pmc):
+        row = self.connection.execute('SELECT 1 FROM oa_articles WHERE pmc = ?',
+                                      (_normalize_pmc(pmc),)).fetchone()
+        return row is not None
+
+
+def build_oa_index(path, index_path, spacing=1024 ** 2):
+    """
+    Build an index of PMC IDs over PubMed Open-Access bulk archives
+
+    Parameters
+    ----------
+    path: str or list, path to an archive or list of paths, archives
+        added later replace articles with the same PMC ID
+    index_path: str, path to the SQLite index to create or extend
+    spacing: int, see `MedlineIndex`
+
+    Returns
+    -------
+    index: OAIndex
+    """
+    index = OAIndex(index_path, spacing=spacing)
+    for p in ([path] if isinstance(path, str) else path):
+        index.add_archive(p)
+    return index
+
+
+def get_oa_article(pmc, index, parser=parse_pubmed_xml, **kwargs):
+    """
+    Parse a single Open-Access article using an index built by `build_oa_index`
+
+    Parameters
+    ----------
+    pmc: str or int, PMC ID, with or without the 'PMC' prefix
+    index: str or OAIndex, path to the index or an opened index.
+        Keep the index opened for many lookups
+    parser: callable, see `OAIndex.get`
+    kwargs: passed to `parser`
+
+    Returns
+    -------
+    article: output of `parser`, None if the article is not indexed
+    """
+    if isinstance(index, OAIndex):
+        return index.get(pmc, parser=parser, **kwargs)
+    with OAIndex(index) as oa_index:
+        return oa_index.get(pmc, parser=parser, **kwargs)
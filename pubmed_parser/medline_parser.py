@@ -1,11 +1,25 @@
+import os
 import re
 import numpy as np
+from glob import glob
+from functools import partial
 from itertools import chain
 from collections import defaultdict
-from pubmed_parser.utils import read_xml, stringify_children, month_or_day_formater
+from lxml import etree
+from pubmed_parser.utils import read_xml, open_xml, stringify_children, month_or_day_formater, imap_bounded, \
+    normalize_text
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
 __all__ = [
     'parse_medline_xml',
+    'iter_medline_xml',
+    'parse_medline_tables',
+    'parse_medline_columns',
+    'iter_medline_batches',
+    'parse_medline_dir',
     'parse_medline_grant_id'
 ]
 
@@ -44,19 +58,23 @@ def parse_mesh_terms(medline):
         String of semi-colon spearated MeSH (Medical Subject Headings)
         terms contained in the document.
     """
-    if medline.find('MeshHeadingList') is not None:
-        mesh = medline.find('MeshHeadingList')
-        mesh_terms_list = [
-            m.find('DescriptorName').attrib.get('UI', '') +
-            ":" +
-            m.find('DescriptorName').text for m in mesh.getchildren()
-        ]
-        mesh_terms = '; '.join(mesh_terms_list)
+    mesh = medline.find('MeshHeadingList')
+    if mesh is not None:
+        mesh_terms = _mesh_terms(mesh)
     else:
         mesh_terms = ''
     return mesh_terms
 
 
+def _mesh_terms(mesh):
+    """Join MeSH descriptors of a `MeshHeadingList` node"""
+    mesh_terms_list = list()
+    for m in mesh.getchildren():
+        descriptor = m.find('DescriptorName')
+        mesh_terms_list.append(descriptor.attrib.get('UI', '') + ":" + descriptor.text)
+    return '; '.join(mesh_terms_list)
+
+
 def parse_publication_types(medline):
     """Parse Publication types from article
 
@@ -70,18 +88,24 @@ def parse_publication_types(medline):
     publication_types: str
         String of semi-colon spearated publication types
     """
-    publication_types = []
     publication_type_list = medline.find('Article/PublicationTypeList')
     if publication_type_list is not None:
-        publication_type_list = publication_type_list.findall('PublicationType')
-        for publication_type in publication_type_list:
-            publication_types.append(
-                publication_type.attrib.get('UI', '') + ':' + (publication_type.text.strip() or '')
-            )
-    publication_types = '; '.join(publication_types)
+        publication_types = _publication_types(publication_type_list)
+    else:
+        publication_types = ''
     return publication_types
 
 
+def _publication_types(publication_type_list):
+    """Join publication types of a `PublicationTypeList` node"""
+    publication_types = []
+    for publication_type in publication_type_list.findall('PublicationType'):
+        publication_types.append(
+            publication_type.attrib.get('UI', '') + ':' + (publication_type.text.strip() or '')
+        )
+    return '; '.join(publication_types)
+
+
 def parse_keywords(medline):
     """Parse keywords from article, separated by ;
 
@@ -96,17 +120,22 @@ def parse_keywords(medline):
         String of concatenated keywords.
     """
     keyword_list = medline.find('KeywordList')
-    keywords = list()
     if keyword_list is not None:
-        for k in keyword_list.findall('Keyword'):
-            if k.text is not None:
-                keywords.append(k.text)
-        keywords = '; '.join(keywords)
+        keywords = _keywords(keyword_list)
     else:
         keywords = ''
     return keywords
 
 
+def _keywords(keyword_list):
+    """Join keywords of a `KeywordList` node"""
+    keywords = list()
+    for k in keyword_list.findall('Keyword'):
+        if k.text is not None:
+            keywords.append(k.text)
+    return '; '.join(keywords)
+
+
 def parse_chemical_list(medline):
     """Parse chemical list from article
 
@@ -120,18 +149,25 @@ def parse_chemical_list(medline):
     chemical_list: str
         String of semi-colon spearated chemical list
     """
-    chemical_list = []
-    chemicals  = medline.find('ChemicalList')
+    chemicals = medline.find('ChemicalList')
     if chemicals is not None:
-        for chemical in chemicals.findall('Chemical'):
-            substance_name = chemical.find('NameOfSubstance')
-            chemical_list.append(
-                substance_name.attrib.get('UI', '') + ':' + (substance_name.text.strip() or '')
-            )
-    chemical_list = '; '.join(chemical_list)
+        chemical_list = _chemical_list(chemicals)
+    else:
+        chemical_list = ''
     return chemical_list
 
 
+def _chemical_list(chemicals):
+    """Join substance names of a `ChemicalList` node"""
+    chemical_list = []
+    for chemical in chemicals.findall('Chemical'):
+        substance_name = chemical.find('NameOfSubstance')
+        chemical_list.append(
+            substance_name.attrib.get('UI', '') + ':' + (substance_name.text.strip() or '')
+        )
+    return '; '.join(chemical_list)
+
+
 def parse_other_id(medline):
     """Parse OtherID from article, each separated by ;
 
@@ -180,41 +216,38 @@ def parse_journal_info(medline):
     """
     journal_info = medline.find('MedlineJournalInfo')
     if journal_info is not None:
-        if journal_info.find('MedlineTA') is not None:
-            medline_ta = journal_info.find('MedlineTA').text or '' # equivalent to Journal name
-        else:
-            medline_ta = ''
-        if journal_info.find('NlmUniqueID') is not None:
-            nlm_unique_id = journal_info.find('NlmUniqueID').text or ''
-        else:
-            nlm_unique_id = ''
-        if journal_info.find('ISSNLinking') is not None:
-            issn_linking = journal_info.find('ISSNLinking').text
-        else:
-            issn_linking = ''
-        if journal_info.find('Country') is not None:
-            country = journal_info.find('Country').text or ''
-        else:
-            country = ''
+        dict_info = _journal_info(journal_info)
     else:
-        medline_ta = ''
-        nlm_unique_id = ''
-        issn_linking = ''
-        country = ''
-    dict_info = {'medline_ta': medline_ta.strip(),
-                 'nlm_unique_id': nlm_unique_id,
-                 'issn_linking': issn_linking,
-                 'country': country}
+        dict_info = {'medline_ta': '',
+                     'nlm_unique_id': '',
+                     'issn_linking': '',
+                     'country': ''}
+    return dict_info
+
+
+def _journal_info(journal_info):
+    """Read a `MedlineJournalInfo` node in a single pass over its children"""
+    fields = dict()
+    for child in journal_info:
+        if child.tag not in fields:
+            fields[child.tag] = child.text
+    dict_info = {'medline_ta': (fields.get('MedlineTA') or '').strip(),  # equivalent to Journal name
+                 'nlm_unique_id': fields.get('NlmUniqueID') or '',
+                 'issn_linking': fields['ISSNLinking'] if 'ISSNLinking' in fields else '',
+                 'country': fields.get('Country') or ''}
     return dict_info
 
 
-def parse_grant_id(medline):
+def parse_grant_id(medline, pmid=None):
     """Parse Grant ID and related information from a given MEDLINE tree
 
     Parameters
     ----------
     medline: Element
         The lxml node pointing to a medline document
+    pmid: str or None
+        PubMed ID of the document if it is already known,
+        otherwise it is parsed from `medline`
 
     Returns
     -------
@@ -224,7 +257,8 @@ def parse_grant_id(medline):
         grant ID, grant acronym, country, and agency.
     """
     article = medline.find('Article')
-    pmid = parse_pmid(medline)
+    if pmid is None:
+        pmid = parse_pmid(medline)
 
     grants = article.find('GrantList')
     grant_list = list()
@@ -262,6 +296,109 @@ def parse_grant_id(medline):
     return grant_list
 
 
+def parse_authors(medline, pmid=None):
+    """Parse authors and their first affiliation from a given MEDLINE tree
+
+    Parameters
+    ----------
+    medline: Element
+        The lxml node pointing to a medline document
+    pmid: str or None
+        see: parse_grant_id()
+
+    Returns
+    -------
+    author_list: list
+        List of authors of the publication in order. Each entry in the
+        dictionary contains the PubMed ID, author order (starting at 1),
+        last name, fore name, initials and affiliation.
+    """
+    if pmid is None:
+        pmid = parse_pmid(medline)
+
+    author_list = list()
+    authors = medline.find('Article/AuthorList')
+    if authors is not None:
+        for order, author in enumerate(authors.findall('Author'), start=1):
+            affiliation = author.find('AffiliationInfo/Affiliation')
+            author_list.append({
+                'pmid': pmid,
+                'author_order': order,
+                'lastname': author.findtext('LastName') or '',
+                'forename': author.findtext('ForeName') or '',
+                'initials': author.findtext('Initials') or '',
+                'affiliation': (affiliation.text or '') if affiliation is not None else ''
+            })
+    return author_list
+
+
+def parse_mesh_headings(medline, pmid=None):
+    """Parse MeSH descriptors from a given MEDLINE tree
+
+    Parameters
+    ----------
+    medline: Element
+        The lxml node pointing to a medline document
+    pmid: str or None
+        see: parse_grant_id()
+
+    Returns
+    -------
+    mesh_list: list
+        List of MeSH descriptors of the publication. Each entry in the
+        dictionary contains the PubMed ID, MeSH ID, MeSH term and whether
+        it is a major topic of the publication.
+    """
+    if pmid is None:
+        pmid = parse_pmid(medline)
+
+    mesh_list = list()
+    mesh = medline.find('MeshHeadingList')
+    if mesh is not None:
+        for descriptor in mesh.findall('MeshHeading/DescriptorName'):
+            mesh_list.append({
+                'pmid': pmid,
+                'mesh_id': descriptor.attrib.get('UI', ''),
+                'mesh_term': descriptor.text or '',
+                'major_topic': descriptor.attrib.get('MajorTopicYN', '') == 'Y'
+            })
+    return mesh_list
+
+
+def parse_chemicals(medline, pmid=None):
+    """Parse chemical substances from a given MEDLINE tree
+
+    Parameters
+    ----------
+    medline: Element
+        The lxml node pointing to a medline document
+    pmid: str or None
+        see: parse_grant_id()
+
+    Returns
+    -------
+    chemical_list: list
+        List of chemicals of the publication. Each entry in the
+        dictionary contains the PubMed ID, chemical ID, substance
+        name and registry number.
+    """
+    if pmid is None:
+        pmid = parse_pmid(medline)
+
+    chemical_list = list()
+    chemicals = medline.find('ChemicalList')
+    if chemicals is not None:
+        for chemical in chemicals.findall('Chemical'):
+            substance_name = chemical.find('NameOfSubstance')
+            chemical_list.append({
+                'pmid': pmid,
+                'chemical_id': substance_name.attrib.get('UI', ''),
+                'chemical_name': (substance_name.text or '').strip(),
+                'registry_number': chemical.findtext('RegistryNumber') or ''
+            })
+    return chemical_list
+
+
 def parse_doi(medline):
     """Parse DOI from a given MEDLINE tree
 
@@ -278,12 +415,16 @@ def parse_doi(medline):
     elocation_ids = article.findall('ELocationID')
 
     doi = ''
-    if len(elocation_ids) > 0:
-        for e in elocation_ids:
-            doi = e.text.strip() or '' if e.attrib.get('EIdType', '') == 'doi' else ''
+    for e in elocation_ids:
+        doi = _doi(e)
     return doi
 
 
+def _doi(elocation_id):
+    """DOI of an `ELocationID` node or empty string for other id types"""
+    return elocation_id.text.strip() or '' if elocation_id.attrib.get('EIdType', '') == 'doi' else ''
+
+
 def date_extractor(journal, year_info_only):
     """Extract PubDate information from an Article in the Medline dataset.
 
@@ -333,21 +474,258 @@ def date_extractor(journal, year_info_only):
         return "-".join(str(x) for x in filter(None, [year, month, day]))
 
 
-inp_list = [["\u0020","\u00A0","\u180E","\u2000","\u2001","\u2002","\u2003","\u2004","\u2005","\u2006","\u2007",
-             "\u2008","\u2009","\u200A","\u200B","\u202F","\u205F","\u3000","\uFEFF"]," "]
+# normalization of text fields, replace an entry by another
+# `TextNormalizer` to change how that field is cleaned
+TEXT_NORMALIZERS = {
+    'title': normalize_text,
+    'abstract': normalize_text
+}
+
+
+def _handle_pmid(node, dict_out, options):
+    dict_out['pmid'] = node.text
+
+
+def _handle_article(node, dict_out, options):
+    _dispatch(node, options['article_handlers'], dict_out, options)
+
+
+def _handle_article_title(node, dict_out, options):
+    title = stringify_children(node, options['subscpt'], options['supscpt']).strip() or ''
+    dict_out['title'] = TEXT_NORMALIZERS['title'](title)
+
+
+def _handle_abstract(node, dict_out, options):
+    subscpt, supscpt = options['subscpt'], options['supscpt']
+    abstract_texts = node.findall('AbstractText')
+    if len(abstract_texts) > 1:
+        # parsing structured abstract
+        if options['incl_sections']:
+            category = 'NlmCategory' if options['nlm_category'] else 'Label'
+        abstract_list = list()
+        for abstract in abstract_texts:
+            if options['incl_sections']:
+                section = abstract.attrib.get(category, '')
+                if section != 'UNASSIGNED':
+                    abstract_list.append('\n')
+                    abstract_list.append(section)
+            section_text = stringify_children(abstract, subscpt, supscpt).strip()
+            abstract_list.append(section_text)
+        abstract = ' '.join(abstract_list).strip()
+    elif len(abstract_texts) == 1:
+        abstract = stringify_children(abstract_texts[0], subscpt, supscpt).strip() or ''
+    else:
+        abstract = stringify_children(node, subscpt, supscpt).strip() or ''
+    dict_out['abstract'] = TEXT_NORMALIZERS['abstract'](abstract)
+
+
+def _handle_author_list(node, dict_out, options):
+    authors_info = list()
+    affiliations_info = list()
+    for author in node.getchildren():
+        firstname = None
+        lastname = None
+        affiliation = None
+        for child in author:
+            if child.tag == 'Initials' and firstname is None:
+                firstname = child.text or ''
+            elif child.tag == 'LastName' and lastname is None:
+                lastname = child.text or ''
+            elif child.tag == 'AffiliationInfo' and affiliation is None:
+                affiliation_node = child.find('Affiliation')
+                if affiliation_node is not None:
+                    affiliation = affiliation_node.text or ''
+        authors_info.append(((firstname or '') + ' ' + (lastname or '')).strip())
+        if affiliation:
+            affiliations_info.append(affiliation)
+    dict_out['author'] = '; '.join(authors_info)
+    dict_out['affiliation'] = '\n'.join(affiliations_info)
+
+
+def _handle_journal(node, dict_out, options):
+    fields = options['fields']
+    if fields is None or 'journal' in fields:
+        dict_out['journal'] = ' '.join(node.xpath('Title/text()'))
+    if fields is None or 'pubdate' in fields:
+        dict_out['pubdate'] = date_extractor(node, options['year_info_only'])
+
+
+def _handle_publication_type_list(node, dict_out, options):
+    dict_out['publication_types'] = _publication_types(node)
+
+
+def _handle_elocation_id(node, dict_out, options):
+    dict_out['doi'] = _doi(node)
+
+
+def _handle_medline_journal_info(node, dict_out, options):
+    dict_out.update(_journal_info(node))
 
-def replace_multiple(inp_list,inp_string):
-    """inp_list: 1st element is a list of possible unicode and the second its replacement"""
 
-    assert  len(inp_list) == 2
-    replacement = inp_list[1]
-    for x in inp_list[0]:
-        inp_string = inp_string.replace(x,replacement)
-    return inp_string
+def _handle_chemical_list(node, dict_out, options):
+    dict_out['chemical_list'] = _chemical_list(node)
 
-def parse_article_info(medline, year_info_only, nlm_category, subscpt = None, supscpt = None, incl_sections = False):
+
+def _handle_mesh_heading_list(node, dict_out, options):
+    dict_out['mesh_terms'] = _mesh_terms(node)
+
+
+def _handle_keyword_list(node, dict_out, options):
+    dict_out['keywords'] = _keywords(node)
+
+
+def _handle_other_id(node, dict_out, options):
+    if 'PMC' in node.text:
+        dict_out['pmc'] = node.text
+    elif dict_out['other_id']:
+        dict_out['other_id'] += '; ' + node.text
+    else:
+        dict_out['other_id'] = node.text
+
+
+# tag to handler tables used by `parse_article_info`, each handler reads
+# one child node and writes its fields to the output dictionary
+_MEDLINE_HANDLERS = {
+    'PMID': _handle_pmid,
+    'Article': _handle_article,
+    'MedlineJournalInfo': _handle_medline_journal_info,
+    'ChemicalList': _handle_chemical_list,
+    'MeshHeadingList': _handle_mesh_heading_list,
+    'KeywordList': _handle_keyword_list,
+    'OtherID': _handle_other_id,
+}
+
+_ARTICLE_HANDLERS = {
+    'ArticleTitle': _handle_article_title,
+    'Abstract': _handle_abstract,
+    'AuthorList': _handle_author_list,
+    'Journal': _handle_journal,
+    'PublicationTypeList': _handle_publication_type_list,
+    'ELocationID': _handle_elocation_id,
+}
+
+# tags handled on every occurrence, other tags only on the first one
+_REPEATED_TAGS = frozenset(['OtherID', 'ELocationID'])
+
+# output fields written by each handler, used to skip unrequested fields
+_HANDLER_FIELDS = {
+    'PMID': ('pmid',),
+    'Article': ('title', 'abstract', 'journal', 'author', 'affiliation',
+                'pubdate', 'publication_types', 'doi'),
+    'MedlineJournalInfo': ('medline_ta', 'nlm_unique_id', 'issn_linking', 'country'),
+    'ChemicalList': ('chemical_list',),
+    'MeshHeadingList': ('mesh_terms',),
+    'KeywordList': ('keywords',),
+    'OtherID': ('pmc', 'other_id'),
+    'ArticleTitle': ('title',),
+    'Abstract': ('abstract',),
+    'AuthorList': ('author', 'affiliation'),
+    'Journal': ('journal', 'pubdate'),
+    'PublicationTypeList': ('publication_types',),
+    'ELocationID': ('doi',),
+}
+
+# all fields returned by `parse_article_info`, in output order
+ARTICLE_FIELDS = (
+    'title', 'abstract', 'journal', 'author', 'affiliation', 'pubdate',
+    'pmid', 'mesh_terms', 'publication_types', 'chemical_list', 'keywords',
+    'doi', 'delete', 'pmc', 'other_id', 'medline_ta', 'nlm_unique_id',
+    'issn_linking', 'country'
+)
+
+_selected_handlers = dict()
+
+
+def _check_fields(fields):
+    """Validate requested fields and return them as a tuple in output order"""
+    if fields is None:
+        return None
+    unknown = set(fields) - set(ARTICLE_FIELDS)
+    if unknown:
+        raise ValueError('Unknown fields %s, choose from %s' % (sorted(unknown), list(ARTICLE_FIELDS)))
+    return tuple(f for f in ARTICLE_FIELDS if f in fields)
+
+
+def _select_handlers(fields):
+    """Handler tables restricted to the ones producing any of `fields`"""
+    if fields is None:
+        return _MEDLINE_HANDLERS, _ARTICLE_HANDLERS
+    if fields not in _selected_handlers:
+        _selected_handlers[fields] = tuple(
+            {tag: handler for tag, handler in handlers.items()
+             if set(_HANDLER_FIELDS[tag]) & set(fields)}
+            for handlers in (_MEDLINE_HANDLERS, _ARTICLE_HANDLERS)
+        )
+    return _selected_handlers[fields]
+
+
+def _dispatch(node, handlers, dict_out, options):
+    """Send each child of `node` to its handler in a single pass"""
+    seen = set()
+    for child in node:
+        handler = handlers.get(child.tag)
+        if handler is None:
+            continue
+        if child.tag in seen and child.tag not in _REPEATED_TAGS:
+            continue
+        seen.add(child.tag)
+        handler(child, dict_out, options)
+
+
+def _article_options(year_info_only, nlm_category, subscpt=None, supscpt=None, incl_sections=False,
+                     fields=None):
+    """Validate `fields` and select handlers once for all citations of a file"""
+    fields = _check_fields(fields)
+    medline_handlers, article_handlers = _select_handlers(fields)
+    return {
+        'year_info_only': year_info_only,
+        'nlm_category': nlm_category,
+        'subscpt': subscpt,
+        'supscpt': supscpt,
+        'incl_sections': incl_sections,
+        'fields': fields,
+        'medline_handlers': medline_handlers,
+        'article_handlers': article_handlers
+    }
+
+
+def _parse_article_info(medline, options):
+    """`parse_article_info` with options prepared by `_article_options`"""
+    dict_out = {
+        'title': '',
+        'abstract': '',
+        'journal': '',
+        'author': '',
+        'affiliation': '',
+        'pubdate': '',
+        'pmid': '',
+        'mesh_terms': '',
+        'publication_types': '',
+        'chemical_list': '',
+        'keywords': '',
+        'doi': '',
+        'delete': False,
+        'pmc': '',
+        'other_id': '',
+        'medline_ta': '',
+        'nlm_unique_id': '',
+        'issn_linking': '',
+        'country': ''
+    }
+    _dispatch(medline, options['medline_handlers'], dict_out, options)
+    fields = options['fields']
+    if fields is not None:
+        dict_out = {f: dict_out[f] for f in fields}
+    return dict_out
+
+
+def parse_article_info(medline, year_info_only, nlm_category, subscpt = None, supscpt = None, incl_sections = False,
+                       fields=None):
     """Parse article nodes from Medline dataset
 
+    Each child of the citation is visited once and sent to the handler
+    registered for its tag in `_MEDLINE_HANDLERS` and `_ARTICLE_HANDLERS`.
+
     Parameters
     ----------
     medline: Element
@@ -356,6 +734,8 @@ def parse_article_info(medline, year_info_only, nlm_category, subscpt = None, su
         see: date_extractor()
     nlm_category: bool
         see: parse_medline_xml()
+    fields: list or None
+        see: parse_medline_xml()
 
     Returns
     -------
@@ -366,99 +746,58 @@ def parse_article_info(medline, year_info_only, nlm_category, subscpt = None, su
         `delete` is always `False` because this function parses
         articles that by definition are not deleted.
     """
-    article = medline.find('Article')
-
-    if article.find('ArticleTitle') is not None:
-        title = stringify_children(article.find('ArticleTitle'),subscpt,supscpt).strip() or ''
-    else:
-        title = ''
+    options = _article_options(year_info_only, nlm_category, subscpt, supscpt, incl_sections, fields)
+    return _parse_article_info(medline, options)
 
-    title = replace_multiple(inp_list,title)
-    title = re.sub(' +', ' ',title.replace("\n", "")).strip()
 
-    if incl_sections:
-        category = 'NlmCategory' if nlm_category else 'Label'
-    if article.find('Abstract/AbstractText') is not None:
-        # parsing structured abstract
-        if len(article.findall('Abstract/AbstractText')) > 1:
-            abstract_list = list()
-            for abstract in article.findall('Abstract/AbstractText'):
-                if incl_sections:
-                    section = abstract.attrib.get(category, '')
-                    if section != 'UNASSIGNED':
-                        abstract_list.append('\n')
-                        abstract_list.append(abstract.attrib.get(category, ''))
-                section_text = stringify_children(abstract,subscpt,supscpt).strip()
-                abstract_list.append(section_text)
-            abstract = ' '.join(abstract_list).strip()
-        else:
-            abstract = stringify_children(article.find('Abstract/AbstractText'),subscpt,supscpt).strip() or ''
-    elif article.find('Abstract') is not None:
-        abstract = stringify_children(article.find('Abstract'),subscpt,supscpt).strip() or ''
-    else:
-        abstract = ''
-
-    abstract = replace_multiple(inp_list,abstract)
-    abstract = re.sub(' +', ' ',abstract.replace("\n", "")).strip()
-
-    if article.find('AuthorList') is not None:
-        authors = article.find('AuthorList').getchildren()
-        authors_info = list()
-        affiliations_info = list()
-        for author in authors:
-            if author.find('Initials') is not None:
-                firstname = author.find('Initials').text or ''
-            else:
-                firstname = ''
-            if author.find('LastName') is not None:
-                lastname = author.find('LastName').text or ''
-            else:
-                lastname = ''
-            if author.find('AffiliationInfo/Affiliation') is not None:
-                affiliation = author.find('AffiliationInfo/Affiliation').text or ''
-            else:
-                affiliation = ''
-            authors_info.append((firstname + ' ' + lastname).strip())
-            affiliations_info.append(affiliation)
-        affiliations_info = '\n'.join([a for a in affiliations_info if a is not ''])
-        authors_info = '; '.join(authors_info)
-    else:
-        affiliations_info = ''
-        authors_info = ''
-
-    journal = article.find('Journal')
-    journal_name = ' '.join(journal.xpath('Title/text()'))
-    pubdate = date_extractor(journal, year_info_only)
-
-    pmid = parse_pmid(medline)
-    doi = parse_doi(medline)
-    mesh_terms = parse_mesh_terms(medline)
-    publication_types = parse_publication_types(medline)
-    chemical_list = parse_chemical_list(medline)
-    keywords = parse_keywords(medline)
-    other_id_dict = parse_other_id(medline)
-    journal_info_dict = parse_journal_info(medline)
-    dict_out = {
-        'title': title,
-        'abstract': abstract,
-        'journal': journal_name,
-        'author': authors_info,
-        'affiliation': affiliations_info,
-        'pubdate': pubdate,
-        'pmid': pmid,
-        'mesh_terms': mesh_terms,
-        'publication_types': publication_types,
-        'chemical_list': chemical_list,
-        'keywords': keywords,
-        'doi': doi,
-        'delete': False
+def _parse_delete_citation(pmid_node, fields):
+    """`parse_delete_citation` with `fields` already checked by `_check_fields`"""
+    dict_delete = {
+        'title': np.nan,
+        'abstract': np.nan,
+        'journal': np.nan,
+        'author': np.nan,
+        'affiliation': np.nan,
+        'pubdate': np.nan,
+        'pmid': pmid_node.text,
+        'doi': np.nan,
+        'other_id': np.nan,
+        'pmc': np.nan,
+        'mesh_terms': np.nan,
+        'keywords': np.nan,
+        'publication_types': np.nan,
+        'chemical_list': np.nan,
+        'delete': True,
+        'medline_ta': np.nan,
+        'nlm_unique_id': np.nan,
+        'issn_linking': np.nan,
+        'country': np.nan,
     }
-    dict_out.update(other_id_dict)
-    dict_out.update(journal_info_dict)
-    return dict_out
+    if fields is not None:
+        dict_delete = {f: dict_delete[f] for f in fields}
+    return dict_delete
+
+
+def parse_delete_citation(pmid_node, fields=None):
+    """Create the record of a deleted citation
+
+    Parameters
+    ----------
+    pmid_node: Element
+        The lxml node pointing to a PMID under `DeleteCitation`
+    fields: list or None
+        see: parse_medline_xml()
+
+    Returns
+    -------
+    article: dict
+        Dictionary with the same keys as `parse_article_info` where every
+        field is `np.nan` except `pmid` and `delete`, which is `True`
+    """
+    return _parse_delete_citation(pmid_node, _check_fields(fields))
 
 
-def parse_medline_xml(path, year_info_only=True, nlm_category=False,subscpt=None,supscpt=None):
+def parse_medline_xml(path, year_info_only=True, nlm_category=False,subscpt=None,supscpt=None, fields=None):
     """Parse XML file from Medline XML format available at
     ftp://ftp.nlm.nih.gov/nlmdata/.medleasebaseline/gz/
 
@@ -479,6 +818,11 @@ def parse_medline_xml(path, year_info_only=True, nlm_category=False,subscpt=None
         if True, this will parse structured abstract where each section if original Label
         if False, this will parse structured abstract where each section will be assigned to
         NLM category of each sections
+    fields: list, default None
+        if given, only these fields (see `ARTICLE_FIELDS`) are extracted and
+        returned for each article, e.g. ['pmid', 'title', 'pubdate', 'mesh_terms'].
+        Parts of the citation that only feed other fields are never parsed.
+        if None, all fields are returned
 
     Returns
     -------
@@ -487,37 +831,131 @@ def parse_medline_xml(path, year_info_only=True, nlm_category=False,subscpt=None
         `parse_article_info`). Articles that have been deleted will be
         added with no information other than the field `delete` being `True`
     """
+    options = _article_options(year_info_only, nlm_category, subscpt, supscpt, fields=fields)
     tree = read_xml(path)
     medline_citations = tree.findall('//MedlineCitationSet/MedlineCitation')
     if len(medline_citations) == 0:
         medline_citations = tree.findall('//MedlineCitation')
-    article_list = list(map(lambda m: parse_article_info(m, year_info_only, nlm_category,subscpt,supscpt), medline_citations))
+    article_list = [_parse_article_info(m, options) for m in medline_citations]
     delete_citations = tree.findall('//DeleteCitation/PMID')
-    dict_delete = [{
-        'title': np.nan,
-        'abstract': np.nan,
-        'journal': np.nan,
-        'author': np.nan,
-        'affiliation': np.nan,
-        'pubdate': np.nan,
-        'pmid': p.text,
-        'doi': np.nan,
-        'other_id': np.nan,
-        'pmc': np.nan,
-        'mesh_terms': np.nan,
-        'keywords': np.nan,
-        'publication_types': np.nan, 
-        'chemical_list': np.nan,
-        'delete': True,
-        'medline_ta': np.nan,
-        'nlm_unique_id': np.nan,
-        'issn_linking': np.nan,
-        'country': np.nan,
-    } for p in delete_citations]
+    dict_delete = [_parse_delete_citation(p, options['fields']) for p in delete_citations]
     article_list.extend(dict_delete)
     return article_list
 
 
+def _clear_element(element):
+    """Free a processed element and everything parsed before it"""
+    element.clear()
+    for node in chain([element], element.iterancestors()):
+        while node.getprevious() is not None:
+            del node.getparent()[0]
+
+
+def _iter_medline_elements(path):
+    """Stream `MedlineCitation` and `DeleteCitation` elements from a file
+
+    Each element is freed once the consumer asks for the next one.
+    """
+    with open_xml(path) as f:
+        for _, element in etree.iterparse(f, events=('end',), tag=('MedlineCitation', 'DeleteCitation')):
+            yield element
+            _clear_element(element)
+
+
+def iter_medline_xml(path, year_info_only=True, nlm_category=False, subscpt=None, supscpt=None, fields=None):
+    """Iteratively parse XML file from Medline XML format with constant memory
+
+    Unlike `parse_medline_xml`, the file is never loaded as a whole tree.
+    Each `MedlineCitation` is parsed as soon as it is read from the
+    (possibly gzipped) stream and freed right after, so memory use does
+    not grow with the size of the file.
+
+    Parameters
+    ----------
+    path: str
+        The path to the XML file, either compressed or uncompressed
+    year_info_only: bool
+        see: parse_medline_xml()
+    nlm_category: bool
+        see: parse_medline_xml()
+    fields: list or None
+        see: parse_medline_xml()
+
+    Yields
+    ------
+    article: dict
+        Dictionary containing information about an article in NLM format
+        (see `parse_article_info`). Each PMID under `DeleteCitation` is
+        yielded as a deleted article (see `parse_delete_citation`)
+    """
+    options = _article_options(year_info_only, nlm_category, subscpt, supscpt, fields=fields)
+    for element in _iter_medline_elements(path):
+        if element.tag == 'MedlineCitation':
+            yield _parse_article_info(element, options)
+        else:
+            for pmid_node in element.findall('PMID'):
+                yield _parse_delete_citation(pmid_node, options['fields'])
+
+
+# child tables available from `parse_medline_tables` and their row parsers
+MEDLINE_TABLES = {
+    'grants': parse_grant_id,
+    'authors': parse_authors,
+    'mesh_headings': parse_mesh_headings,
+    'chemicals': parse_chemicals,
+}
+
+
+def parse_medline_tables(path, tables=('grants',), year_info_only=True, nlm_category=False,
+                         subscpt=None, supscpt=None, fields=None):
+    """Parse articles and flattened child tables from Medline XML in one pass
+
+    The file is decompressed and parsed only once, each citation is sent
+    to `parse_article_info` and to the row parser of each requested table.
+
+    Parameters
+    ----------
+    path: str
+        The path to the XML file, either compressed or uncompressed
+    tables: list
+        Child tables to extract along with the articles, any of `grants`
+        (see `parse_grant_id`), `authors` (see `parse_authors`),
+        `mesh_headings` (see `parse_mesh_headings`) and `chemicals`
+        (see `parse_chemicals`). Defaults to `grants` only
+    year_info_only: bool
+        see: parse_medline_xml()
+    nlm_category: bool
+        see: parse_medline_xml()
+    fields: list or None
+        see: parse_medline_xml()
+
+    Returns
+    -------
+    dict_tables: dict
+        Dictionary with key `articles`, the list returned by
+        `parse_medline_xml`, and one key per requested table holding
+        the flattened list of rows of all citations
+    """
+    unknown = set(tables) - set(MEDLINE_TABLES)
+    if unknown:
+        raise ValueError('Unknown tables %s, choose from %s' % (sorted(unknown), sorted(MEDLINE_TABLES)))
+
+    options = _article_options(year_info_only, nlm_category, subscpt, supscpt, fields=fields)
+    articles = list()
+    deleted = list()
+    dict_tables = {table: list() for table in tables}
+    for element in _iter_medline_elements(path):
+        if element.tag == 'MedlineCitation':
+            pmid = parse_pmid(element)
+            articles.append(_parse_article_info(element, options))
+            for table in tables:
+                dict_tables[table].extend(MEDLINE_TABLES[table](element, pmid))
+        else:
+            deleted.extend(_parse_delete_citation(p, options['fields']) for p in element.findall('PMID'))
+    dict_tables['articles'] = articles + deleted
+    return dict_tables
+
+
 def parse_medline_grant_id(path):
     """Parse grant id from Medline XML file
 
@@ -538,4 +976,189 @@ def parse_medline_grant_id(path):
         medline_citations = tree.findall('//MedlineCitation')
     grant_id_list = list(map(parse_grant_id, medline_citations))
     grant_id_list = list(chain(*grant_id_list)) # flatten list
-    return grant_id_list
\ No newline at end of file
+    return grant_id_list
+
+
+class _ColumnRow(object):
+    """
+    Output of the handlers writing the current citation directly into
+    the last slot of each column list, so no dictionary is built per row.
+    Fields without a column are dropped
+    """
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __getitem__(self, name):
+        values = self.columns.get(name)
+        return values[-1] if values is not None else ''
+
+    def __setitem__(self, name, value):
+        values = self.columns.get(name)
+        if values is not None:
+            values[-1] = value
+
+    def update(self, other):
+        for name, value in other.items():
+            self[name] = value
+
+
+def _iter_citation_rows(path):
+    """Yield `(MedlineCitation, None)` or `(None, pmid)` of each deleted PMID, in file order"""
+    for element in _iter_medline_elements(path):
+        if element.tag == 'MedlineCitation':
+            yield element, None
+        else:
+            for pmid in element.findall('PMID'):
+                yield None, pmid.text
+
+
+def _columns_to_batch(columns, as_arrow):
+    """Turn lists of column values into NumPy/list columns or an Arrow RecordBatch"""
+    if as_arrow:
+        arrays = [pa.array(values, type=pa.bool_() if name == 'delete' else pa.string())
+                  for name, values in columns.items()]
+        return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+    batch = dict(columns)
+    if 'delete' in batch:
+        batch['delete'] = np.array(batch['delete'], dtype=bool)
+    return batch
+
+
+def iter_medline_batches(path, batch_size=10000, as_arrow=False, year_info_only=True, nlm_category=False,
+                         subscpt=None, supscpt=None, fields=None):
+    """Iteratively parse Medline XML into column batches
+
+    Values of each citation are appended to one list per field instead
+    of being kept as one dictionary per article. Fields of deleted
+    citations other than `pmid` and `delete` are null (`None`) instead
+    of `np.nan`.
+
+    Parameters
+    ----------
+    path: str
+        The path to the XML file, either compressed or uncompressed
+    batch_size: int or None, default 10000
+        Maximum number of articles per batch, if None all articles of
+        the file are returned in a single batch
+    as_arrow: bool, default False
+        if True, yield `pyarrow.RecordBatch` with string columns and a
+        boolean `delete` column (requires pyarrow).
+        if False, yield dictionaries of columns where `delete` is a
+        boolean NumPy array and other columns are lists of str or None
+    year_info_only: bool
+        see: parse_medline_xml()
+    nlm_category: bool
+        see: parse_medline_xml()
+    fields: list or None
+        see: parse_medline_xml()
+
+    Yields
+    ------
+    batch: dict or pyarrow.RecordBatch
+        Columns of at most `batch_size` articles
+    """
+    if as_arrow and pa is None:
+        raise ImportError('pyarrow is required to return Arrow record batches, '
+                          'install it with `pip install pyarrow`')
+    options = _article_options(year_info_only, nlm_category, subscpt, supscpt, fields=fields)
+    column_names = options['fields'] or ARTICLE_FIELDS
+    defaults = [(name, False if name == 'delete' else '') for name in column_names]
+    columns = {name: list() for name in column_names}
+    row = _ColumnRow(columns)
+    n_rows = 0
+    for citation, deleted_pmid in _iter_citation_rows(path):
+        if citation is not None:
+            # append the defaults, then let the handlers overwrite them in place
+            for name, default in defaults:
+                columns[name].append(default)
+            _dispatch(citation, options['medline_handlers'], row, options)
+        else:
+            for name in column_names:
+                columns[name].append(None)
+            row['pmid'] = deleted_pmid
+            row['delete'] = True
+        n_rows += 1
+        if batch_size is not None and n_rows >= batch_size:
+            yield _columns_to_batch(columns, as_arrow)
+            columns = {name: list() for name in column_names}
+            row = _ColumnRow(columns)
+            n_rows = 0
+    if n_rows > 0:
+        yield _columns_to_batch(columns, as_arrow)
+
+
+def parse_medline_columns(path, as_arrow=False, year_info_only=True, nlm_category=False,
+                          subscpt=None, supscpt=None, fields=None):
+    """Parse Medline XML file into columns
+
+    Same as `iter_medline_batches` with all articles of the file in
+    one batch, e.g. `pd.DataFrame(parse_medline_columns(path))` or
+    `parse_medline_columns(path, as_arrow=True).to_pandas()`
+
+    Returns
+    -------
+    batch: dict or pyarrow.RecordBatch
+        Columns of all articles in the file
+    """
+    for batch in iter_medline_batches(path, batch_size=None, as_arrow=as_arrow,
+                                      year_info_only=year_info_only, nlm_category=nlm_category,
+                                      subscpt=subscpt, supscpt=supscpt, fields=fields):
+        return batch
+    column_names = _check_fields(fields) or ARTICLE_FIELDS
+    return _columns_to_batch({name: list() for name in column_names}, as_arrow)
+
+
+def list_medline_path(path_dir):
+    """List MEDLINE XML files, compressed or not, under given directory
+
+    Parameters
+    ----------
+    path_dir: str
+        Path to a directory of MEDLINE baseline or update files
+
+    Returns
+    -------
+    path_list: list
+        Sorted list of `.xml` and `.xml.gz` paths, so that update files
+        come after the files they update
+    """
+    path_dir = os.path.expanduser(path_dir)
+    path_list = glob(os.path.join(path_dir, '*.xml.gz')) + glob(os.path.join(path_dir, '*.xml'))
+    return sorted(path_list, key=os.path.basename)
+
+
+def parse_medline_dir(path, n_jobs=None, ordered=True, max_pending=None, **kwargs):
+    """Parse MEDLINE XML files in parallel over a pool of processes
+
+    Parameters
+    ----------
+    path: str or list
+        Directory of MEDLINE files (see `list_medline_path`) or list of paths
+    n_jobs: int, default None
+        Number of processes, defaults to the number of CPUs
+    ordered: bool, default True
+        if True, files are yielded in the order of `path`,
+        if False, files are yielded as soon as they are parsed
+    max_pending: int, default None
+        Maximum number of files being parsed or waiting to be consumed,
+        defaults to twice `n_jobs`. This bounds the memory used by
+        parsed files when the consumer is slower than the workers
+    kwargs:
+        Keyword arguments passed to `parse_medline_xml`,
+        such as `year_info_only` or `fields`
+
+    Yields
+    ------
+    (path, article_list): tuple
+        Path of each file and its list of articles (see `parse_medline_xml`)
+    """
+    _check_fields(kwargs.get('fields'))  # fail before starting workers
+    if isinstance(path, str):
+        path = list_medline_path(path)
+    parse_file = partial(parse_medline_xml, **kwargs)
+    for file_path, article_list in imap_bounded(parse_file, path, n_jobs=n_jobs,
+                                                ordered=ordered, max_pending=max_pending):
+        yield file_path, article_list
+
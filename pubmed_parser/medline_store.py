@@ -0,0 +1,152 @@
+"""
+Local store of the last version of each MEDLINE citation, keyed by PMID
+"""
+import os
+import json
+import sqlite3
+from .medline_parser import iter_medline_xml, list_medline_path
+from .writers import record_to_json
+
+__all__ = [
+    'MedlineStore'
+]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    pmid TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    deleted INTEGER NOT NULL,
+    record TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    file_name TEXT PRIMARY KEY,
+    n_articles INTEGER NOT NULL,
+    n_deleted INTEGER NOT NULL
+);
+"""
+
+# a citation only replaces the stored one if it comes from the same or a
+# later file, so files can be applied in any order
+_UPSERT = """
+INSERT INTO articles (pmid, file_name, deleted, record) VALUES (?, ?, ?, ?)
+ON CONFLICT (pmid) DO UPDATE SET
+    file_name = excluded.file_name,
+    deleted = excluded.deleted,
+    record = excluded.record
+WHERE excluded.file_name >= articles.file_name
+"""
+
+
+class MedlineStore(object):
+    """
+    SQLite store holding the last version of each MEDLINE citation
+
+    Applying a baseline or update file costs time proportional to that
+    file only: each citation replaces the stored version of its PMID and
+    each `DeleteCitation` marks it as deleted, as long as the file name
+    sorts after the file that stored the current version (MEDLINE file
+    names sort in release order). Files already applied are skipped.
+
+    Parameters
+    ----------
+    path: str, path to the SQLite database, created if it does not exist
+    batch_size: int, number of citations written per `executemany`
+
+    Example
+    -------
+    >> with MedlineStore('medline.db') as store:
+    >>     store.update('~/Downloads/medline')  # apply new baseline/update files
+    >>     article = store.get('17942999')
+    """
+
+    def __init__(self, path, batch_size=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(_SCHEMA)
+
+    def is_applied(self, path):
+        """Whether a file with the same name was already applied"""
+        file_name = os.path.basename(path)
+        cursor = self.connection.execute('SELECT 1 FROM files WHERE file_name = ?', (file_name,))
+        return cursor.fetchone() is not None
+
+    def apply_file(self, path, force=False, **kwargs):
+        """
+        Apply citations and deletions of one MEDLINE file
+
+        Parameters
+        ----------
+        path: str, path to a MEDLINE XML file, compressed or not
+        force: bool, apply the file even if it was already applied
+        kwargs: passed to `iter_medline_xml`, such as `year_info_only`
+
+        Returns
+        -------
+        applied: bool, False if the file was skipped
+        """
+        if not force and self.is_applied(path):
+            return False
+        file_name = os.path.basename(path)
+        n_articles = 0
+        n_deleted = 0
+        with self.connection:
+            rows = list()
+            for article in iter_medline_xml(path, **kwargs):
+                if article['delete']:
+                    rows.append((article['pmid'], file_name, 1, None))
+                    n_deleted += 1
+                else:
+                    rows.append((article['pmid'], file_name, 0, record_to_json(article)))
+                    n_articles += 1
+                if len(rows) >= self.batch_size:
+                    self.connection.executemany(_UPSERT, rows)
+                    rows = list()
+            self.connection.executemany(_UPSERT, rows)
+            self.connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)',
+                                    (file_name, n_articles, n_deleted))
+        return True
+
+    def update(self, path_dir, **kwargs):
+        """
+        Apply all MEDLINE files under `path_dir` that were not applied yet,
+        in file name order
+
+        Returns
+        -------
+        applied: list, paths of the applied files
+        """
+        return [path for path in list_medline_path(path_dir)
+                if self.apply_file(path, **kwargs)]
+
+    def get(self, pmid):
+        """Last version of the citation as a dictionary, None if deleted or unknown"""
+        cursor = self.connection.execute('SELECT record FROM articles WHERE pmid = ? AND deleted = 0',
+                                         (str(pmid),))
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def __contains__(self, pmid):
+        return self.get(pmid) is not None
+
+    def __iter__(self):
+        """Iterate over last versions of all citations that are not deleted"""
+        cursor = self.connection.execute('SELECT record FROM articles WHERE deleted = 0')
+        for (record,) in cursor:
+            yield json.loads(record)
+
+    def __len__(self):
+        cursor = self.connection.execute('SELECT COUNT(*) FROM articles WHERE deleted = 0')
+        return cursor.fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,4 +1,6 @@
 import os
+import tarfile
+from functools import partial
 from lxml import etree
 from itertools import chain
 from .utils import *
@@ -9,21 +11,18 @@ __all__ = [
     'parse_pubmed_xml',
     'parse_pubmed_paragraph',
     'parse_pubmed_references',
-    'parse_pubmed_caption'
+    'parse_pubmed_caption',
+    'parse_pubmed_table',
+    'OAArticle',
+    'iter_oa_tarball'
 ]
 
 
-inp_list = [["\u0020","\u00A0","\u180E","\u2000","\u2001","\u2002","\u2003","\u2004","\u2005","\u2006","\u2007",
-             "\u2008","\u2009","\u200A","\u200B","\u202F","\u205F","\u3000","\uFEFF"]," "]
-
-def replace_multiple(inp_list,inp_string):
-    """inp_list: 1st element is a list of possible unicode and the second its replacement"""
-
-    assert  len(inp_list) == 2
-    replacement = inp_list[1]
-    for x in inp_list[0]:
-        inp_string = inp_string.replace(x,replacement)
-    return inp_string
+# normalization of text fields, replace an entry by another
+# `TextNormalizer` to change how that field is cleaned
+TEXT_NORMALIZERS = {
+    'paragraph': normalize_text
+}
 
 
 def list_xml_path(path_dir):
@@ -85,104 +84,142 @@ def parse_article_meta(tree):
     return dict_article_meta
 
 
-def parse_pubmed_xml(path, include_path=False, nxml=False):
+# all fields returned by `parse_pubmed_xml`, in output order
+PUBMED_XML_FIELDS = (
+    'full_title', 'abstract', 'journal', 'pmid', 'pmc', 'doi', 'publisher_id',
+    'author_list', 'affiliation_list', 'publication_year', 'publication_date',
+    'subjects'
+)
+
+
+def parse_pubmed_xml(path, include_path=False, nxml=False, fields=None):
     """
     Given single xml path, extract information from xml file
     and return parsed xml file in dictionary format.
+
+    If `fields` is given, only these fields (see `PUBMED_XML_FIELDS`)
+    are extracted and returned, other parts of the article are skipped.
     """
+    fields = _check_pubmed_xml_fields(fields)
     tree = read_xml(path, nxml)
+    dict_out = _parse_pubmed_xml_tree(tree, fields)
+    if include_path:
+        dict_out['path_to_file'] = path
+    return dict_out
 
-    tree_title = tree.find('.//title-group/article-title')
-    if tree_title is not None:
-        title = [t for t in tree_title.itertext()]
-        sub_title = tree.xpath('.//title-group/subtitle/text()')
-        title.extend(sub_title)
-        title = [t.replace('\n', ' ').replace('\t', ' ') for t in title]
-        full_title = ' '.join(title)
-    else:
-        full_title = ''
 
-    try:
-        abstracts = list()
-        abstract_tree = tree.findall('.//abstract')
-        for a in abstract_tree:
-            for t in a.itertext():
-                text = t.replace('\n', ' ').replace('\t', ' ').strip()
-                abstracts.append(text)
-        abstract = ' '.join(abstracts)
-    except:
-        abstract = ''
-
-    journal_node = tree.findall('.//journal-title')
-    if journal_node is not None:
-        journal = ' '.join([j.text for j in journal_node])
-    else:
-        journal = ''
-
-    dict_article_meta = parse_article_meta(tree)
-    pub_year_node = tree.find('.//pub-date/year')
-    pub_year = pub_year_node.text if pub_year_node is not None else ''
-    pub_month_node = tree.find('.//pub-date/month')
-    pub_month = pub_month_node.text if pub_month_node is not None else '01'
-    pub_day_node = tree.find('.//pub-date/day')
-    pub_day = pub_day_node.text if pub_day_node is not None else '01'
-
-    subjects_node = tree.findall('.//article-categories.//subj-group/subject')
-    subjects = list()
-    if subjects_node is not None:
-        for s in subjects_node:
-            subject = ' '.join([s_.strip() for s_ in s.itertext()]).strip()
-            subjects.append(subject)
-        subjects = '; '.join(subjects)
-    else:
-        subjects = ''
+def _check_pubmed_xml_fields(fields):
+    """Validate requested fields and return them as a tuple in output order"""
+    if fields is None:
+        return PUBMED_XML_FIELDS
+    unknown = set(fields) - set(PUBMED_XML_FIELDS)
+    if unknown:
+        raise ValueError('Unknown fields %s, choose from %s' % (sorted(unknown), list(PUBMED_XML_FIELDS)))
+    return tuple(f for f in PUBMED_XML_FIELDS if f in fields)
+
+
+def _parse_pubmed_xml_tree(tree, fields, dict_article_meta=None):
+    """Extract `fields` of `parse_pubmed_xml` from a parsed article"""
+    dict_out = dict()
+
+    if 'full_title' in fields:
+        tree_title = tree.find('.//title-group/article-title')
+        if tree_title is not None:
+            title = [t for t in tree_title.itertext()]
+            sub_title = tree.xpath('.//title-group/subtitle/text()')
+            title.extend(sub_title)
+            title = [t.replace('\n', ' ').replace('\t', ' ') for t in title]
+            full_title = ' '.join(title)
+        else:
+            full_title = ''
+        dict_out['full_title'] = full_title.strip()
 
-    # create affiliation dictionary
-    affil_id = tree.xpath('.//aff[@id]/@id')
-    if len(affil_id) > 0:
-        affil_id = list(map(str, affil_id))
-    else:
-        affil_id = ['']  # replace id with empty list
-
-    affil_name = tree.xpath('.//aff[@id]')
-    affil_name_list = list()
-    for e in affil_name:
-        name = stringify_affiliation_rec(e)
-        name = name.strip().replace('\n', ' ')
-        affil_name_list.append(name)
-    affiliation_list = [[idx, name] for idx, name in zip(affil_id, affil_name_list)]
-
-    tree_author = tree.xpath('.//contrib-group/contrib[@contrib-type="author"]')
-    author_list = list()
-    for author in tree_author:
-        author_aff = author.findall('xref[@ref-type="aff"]')
-        try:
-            ref_id_list = [str(a.attrib['rid']) for a in author_aff]
-        except:
-            ref_id_list = ''
+    if 'abstract' in fields:
         try:
-            author_list.append([author.find('name/surname').text,
-                                author.find('name/given-names').text,
-                                ref_id_list])
+            abstracts = list()
+            abstract_tree = tree.findall('.//abstract')
+            for a in abstract_tree:
+                for t in a.itertext():
+                    text = t.replace('\n', ' ').replace('\t', ' ').strip()
+                    abstracts.append(text)
+            abstract = ' '.join(abstracts)
         except:
-            author_list.append(['', '', ref_id_list])
-    author_list = flatten_zip_author(author_list)
-
-    dict_out = {'full_title': full_title.strip(),
-                'abstract': abstract,
-                'journal': journal,
-                'pmid': dict_article_meta['pmid'],
-                'pmc': dict_article_meta['pmc'],
-                'doi': dict_article_meta['doi'],
-                'publisher_id': dict_article_meta['publisher_id'],
-                'author_list': author_list,
-                'affiliation_list': affiliation_list,
-                'publication_year': pub_year,
-                'publication_date': '{}-{}-{}'.format(pub_day, pub_month, pub_year),
-                'subjects': subjects}
-    if include_path:
-        dict_out['path_to_file'] = path
-    return dict_out
+            abstract = ''
+        dict_out['abstract'] = abstract
+
+    if 'journal' in fields:
+        journal_node = tree.findall('.//journal-title')
+        if journal_node is not None:
+            journal = ' '.join([j.text for j in journal_node])
+        else:
+            journal = ''
+        dict_out['journal'] = journal
+
+    if set(fields) & set(['pmid', 'pmc', 'doi', 'publisher_id']):
+        if dict_article_meta is None:
+            dict_article_meta = parse_article_meta(tree)
+        dict_out['pmid'] = dict_article_meta['pmid']
+        dict_out['pmc'] = dict_article_meta['pmc']
+        dict_out['doi'] = dict_article_meta['doi']
+        dict_out['publisher_id'] = dict_article_meta['publisher_id']
+
+    if 'author_list' in fields:
+        tree_author = tree.xpath('.//contrib-group/contrib[@contrib-type="author"]')
+        author_list = list()
+        for author in tree_author:
+            author_aff = author.findall('xref[@ref-type="aff"]')
+            try:
+                ref_id_list = [str(a.attrib['rid']) for a in author_aff]
+            except:
+                ref_id_list = ''
+            try:
+                author_list.append([author.find('name/surname').text,
+                                    author.find('name/given-names').text,
+                                    ref_id_list])
+            except:
+                author_list.append(['', '', ref_id_list])
+        dict_out['author_list'] = flatten_zip_author(author_list)
+
+    if 'affiliation_list' in fields:
+        # create affiliation dictionary
+        affil_id = tree.xpath('.//aff[@id]/@id')
+        if len(affil_id) > 0:
+            affil_id = list(map(str, affil_id))
+        else:
+            affil_id = ['']  # replace id with empty list
+
+        affil_name = tree.xpath('.//aff[@id]')
+        affil_name_list = list()
+        for e in affil_name:
+            name = stringify_affiliation_rec(e)
+            name = name.strip().replace('\n', ' ')
+            affil_name_list.append(name)
+        dict_out['affiliation_list'] = [[idx, name] for idx, name in zip(affil_id, affil_name_list)]
+
+    if 'publication_year' in fields or 'publication_date' in fields:
+        pub_year_node = tree.find('.//pub-date/year')
+        pub_year = pub_year_node.text if pub_year_node is not None else ''
+        dict_out['publication_year'] = pub_year
+    if 'publication_date' in fields:
+        pub_month_node = tree.find('.//pub-date/month')
+        pub_month = pub_month_node.text if pub_month_node is not None else '01'
+        pub_day_node = tree.find('.//pub-date/day')
+        pub_day = pub_day_node.text if pub_day_node is not None else '01'
+        dict_out['publication_date'] = '{}-{}-{}'.format(pub_day, pub_month, pub_year)
+
+    if 'subjects' in fields:
+        subjects_node = tree.findall('.//article-categories.//subj-group/subject')
+        subjects = list()
+        if subjects_node is not None:
+            for s in subjects_node:
+                subject = ' '.join([s_.strip() for s_ in s.itertext()]).strip()
+                subjects.append(subject)
+            subjects = '; '.join(subjects)
+        else:
+            subjects = ''
+        dict_out['subjects'] = subjects
+
+    return {f: dict_out[f] for f in fields}
 
 
 def parse_pubmed_references(path):
@@ -191,7 +228,10 @@ def parse_pubmed_references(path):
     to list of dictionary
     """
     tree = read_xml(path)
-    dict_article_meta = parse_article_meta(tree)
+    return _parse_references_tree(tree, parse_article_meta(tree))
+
+
+def _parse_references_tree(tree, dict_article_meta):
     pmid = dict_article_meta['pmid']
     pmc = dict_article_meta['pmc']
 
@@ -272,80 +312,80 @@ def parse_pubmed_paragraph(path, all_paragraph=False, section='body',subscpt = N
     and its cited PMID
     """
     tree = read_xml(path)
+    return _parse_paragraph_tree(tree, parse_article_meta(tree), all_paragraph, section, subscpt, supscpt)
 
 
-    # Remove undesired sections
-    for elem in tree.findall("//fig"):
-        elem.getparent().remove(elem)
+# elements left out of paragraphs
+_PARAGRAPH_SKIP = ('fig', 'table-wrap')
 
-    for elem in tree.findall("//table-wrap"):
-        elem.getparent().remove(elem)
 
+def _outermost(nodes):
+    """Drop nodes that are inside another one of `nodes`"""
+    nodes = list(nodes)
+    node_set = set(nodes)
+    return [n for n in nodes if not any(a in node_set for a in n.iterancestors())]
 
-    dict_article_meta = parse_article_meta(tree)
+
+def _enclosing_title(stack, titles, level, subscpt, supscpt):
+    """
+    Title of the `level`-th enclosing element, 1 being the parent, rendered
+    on first use and cached in `titles`. Empty if it has no `title` child
+    """
+    if level > len(stack):
+        return ''
+    if titles[-level] is None:
+        title = stack[-level].find('title')
+        titles[-level] = stringify_children(title, subscpt, supscpt).strip() if title is not None else ''
+    return titles[-level]
+
+
+def _parse_paragraph_tree(tree, dict_article_meta, all_paragraph=False, section='body', subscpt=None, supscpt=None):
+    """
+    Walk the body, or abstracts, once keeping a stack of enclosing
+    elements and their titles. Figures and tables are skipped, the
+    tree is not modified
+    """
     pmid = dict_article_meta['pmid']
     pmc = dict_article_meta['pmc']
 
-    
     if section == 'body':
-        extractor_tag = '//body//p'
+        roots = _outermost(tree.iter('body'))
     if section == 'abs':
-        extractor_tag = '//front//abstract//p'
+        roots = _outermost(a for front in tree.iter('front') for a in front.iter('abstract'))
 
-
-    paragraphs = tree.xpath(extractor_tag)
     dict_pars = list()
-
-
-    for par_nber, paragraph in enumerate(paragraphs):
-
-        paragraph_text = stringify_children(paragraph,subscpt,supscpt)
-        section = paragraph.find('../title')
-        if section is not None:
-            section = stringify_children(section,subscpt,supscpt).strip()
-        else:
-            section = ''
-
-        super_section = paragraph.find('../../title')
-        if super_section is not None:
-            super_section = stringify_children(super_section,subscpt,supscpt).strip()
-        else:
-            super_section = ''
-
-        s_super_section = paragraph.find('../../../title')
-        if s_super_section is not None:
-            s_super_section = stringify_children(s_super_section,subscpt,supscpt).strip()
-        else:
-            s_super_section = ''
-
-        if extractor_tag == '//front//abstract//p':
-            section_list = ['Abstract', super_section, section]
-        else:
-            section_list = [s_super_section, super_section, section]
-
-        ref_ids = list()
-        for reference in paragraph.getchildren():
-            if 'rid' in reference.attrib.keys():
-                ref_id = reference.attrib['rid']
-                ref_ids.append(ref_id)
-
-
-        #section_list = [unidecode(mysection) for mysection in section_list]
-
-        paragraph_text_clean = paragraph_text
-        paragraph_text_clean = replace_multiple(inp_list,paragraph_text_clean)
-        paragraph_text_clean = re.sub(' +', ' ',paragraph_text_clean.replace("\n", "")).strip()
-
-        dict_par = {'pmc': pmc,
-                    'pmid': pmid,
-                    'paragraph_id': par_nber,
-                    'sections': section_list,
-                    'text': paragraph_text_clean}
-
-
-
-        if len(ref_ids) >= 1 or all_paragraph:
-            dict_pars.append(dict_par)
+    par_nber = 0
+    for root in roots:
+        stack = list(root.iterancestors())[::-1]  # enclosing elements, outermost first
+        titles = [None] * len(stack)
+        walker = etree.iterwalk(root, events=('start', 'end'))
+        for event, node in walker:
+            if event == 'end':
+                stack.pop()
+                titles.pop()
+                continue
+            if node.tag in _PARAGRAPH_SKIP:
+                walker.skip_subtree()
+            elif node.tag == 'p':
+                ref_ids = [child.attrib['rid'] for child in node
+                           if child.tag not in _PARAGRAPH_SKIP and 'rid' in child.attrib]
+                if len(ref_ids) >= 1 or all_paragraph:
+                    section_list = [_enclosing_title(stack, titles, level, subscpt, supscpt)
+                                    for level in (3, 2, 1)]
+                    if section == 'abs':
+                        section_list[0] = 'Abstract'
+                    section_titles = [_enclosing_title(stack, titles, len(stack) - i, subscpt, supscpt)
+                                      for i, parent in enumerate(stack) if parent.tag == 'sec']
+                    paragraph_text = stringify_children(node, subscpt, supscpt, skip=_PARAGRAPH_SKIP)
+                    dict_pars.append({'pmc': pmc,
+                                      'pmid': pmid,
+                                      'paragraph_id': par_nber,
+                                      'sections': section_list,
+                                      'section_titles': section_titles,
+                                      'text': TEXT_NORMALIZERS['paragraph'](paragraph_text)})
+                par_nber += 1
+            stack.append(node)
+            titles.append(None)
 
     return dict_pars
 
@@ -356,7 +396,10 @@ def parse_pubmed_caption(path):
     reference id back to that figure
     """
     tree = read_xml(path)
-    dict_article_meta = parse_article_meta(tree)
+    return _parse_caption_tree(tree, parse_article_meta(tree))
+
+
+def _parse_caption_tree(tree, dict_article_meta):
     pmid = dict_article_meta['pmid']
     pmc = dict_article_meta['pmc']
 
@@ -383,43 +426,142 @@ def parse_pubmed_caption(path):
     return dict_captions
 
 
-def table_to_df(table_text):
+# colspan above this is treated as malformed
+_MAX_COLSPAN = 1000
+
+
+def _span(value, default):
+    """Parse a rowspan or colspan attribute"""
+    if value is None or value == '1':
+        return 1
+    try:
+        span = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return default if span == 0 else max(span, 1)
+
+
+def _cell_text(cell):
+    text = stringify_children(cell) if len(cell) else (cell.text or '')
+    return text if is_ascii(text) else unidecode(text)
+
+
+def _expand_rows(rows):
     """
-    Function to transform plain xml text to list of row values and
-    columns
-    """
-    table_tree = etree.fromstring(table_text)
-    columns = []
-    for tr in table_tree.xpath('thead/tr'):
-        for c in tr.getchildren():
-            columns.append(unidecode(stringify_children(c)))
-
-    row_values = []
-    len_rows = []
-    for tr in table_tree.findall('tbody/tr'):
-        es = tr.xpath('td')
-        row_value = [unidecode(stringify_children(e)) for e in es]
-        len_rows.append(len(es))
-        row_values.append(row_value)
-    if len(len_rows) >= 1:
-        len_row = max(set(len_rows), key=len_rows.count)
-        row_values = [r for r in row_values if len(r) == len_row] # remove row with different length
-        return columns, row_values
-    else:
+    Text of the cells of `rows`, list of `tr` elements, as a grid where cells
+    spanning several rows or columns are repeated in every position they cover
+    """
+    grid = list()
+    spans = dict()  # column -> [number of rows left, text] of cells spanning rows
+
+    def fill_spanned(row):
+        while len(row) in spans:
+            span = spans[len(row)]
+            row.append(span[1])
+            span[0] -= 1
+            if span[0] == 0:
+                del spans[len(row) - 1]
+
+    for i, tr in enumerate(rows):
+        row = list()
+        for cell in tr.iterchildren('td', 'th'):
+            fill_spanned(row)
+            text = _cell_text(cell)
+            rowspan = _span(cell.get('rowspan'), len(rows) - i)  # 0 spans the rest of the section
+            colspan = min(_span(cell.get('colspan'), 1), _MAX_COLSPAN)
+            for _ in range(colspan):
+                if rowspan > 1:
+                    spans[len(row)] = [rowspan - 1, text]
+                row.append(text)
+        fill_spanned(row)
+        if spans and len(row) < max(spans):
+            # cells spanning from above right of a short row, filling them
+            # may use up the last span so the width is taken once
+            width = max(spans)
+            while len(row) < width:
+                row.append('')
+                fill_spanned(row)
+        if row:
+            grid.append(row)
+    return grid
+
+
+def _table_header(header_grid, n_columns):
+    """One name per column, joining the header rows, e.g. 'Group A' and 'Group B'"""
+    columns = list()
+    for j in range(n_columns):
+        names = list()
+        for row in header_grid:
+            if j < len(row) and row[j] and row[j] not in names:
+                names.append(row[j])
+        columns.append(' '.join(names))
+    return columns
+
+
+def _table_rows(table_tree, columnar=False):
+    """
+    Column names and cell values read directly from a `table` element
+
+    All rows are kept. Rows are padded with empty strings to the number
+    of columns of the widest row.
+
+    Returns
+    -------
+    (columns, values): list of column names, empty if the table has no
+        `thead`, and list of rows, or list of columns if `columnar`.
+        (None, None) if the table has no body rows
+    """
+    header_grid = _expand_rows(table_tree.findall('thead/tr'))
+    body_grid = _expand_rows(table_tree.findall('tbody/tr') + table_tree.findall('tr'))
+    if not body_grid:
         return None, None
+    n_columns = max(len(row) for row in chain(header_grid, body_grid))
+    for row in body_grid:
+        row.extend([''] * (n_columns - len(row)))
+    columns = _table_header(header_grid, n_columns) if header_grid else []
+    if columnar:
+        return columns, [list(column) for column in zip(*body_grid)]
+    return columns, body_grid
 
 
-def parse_pubmed_table(path, return_xml=True):
+def table_to_df(table_text, columnar=False):
+    """
+    Function to transform plain xml text to list of row values and
+    columns, see `parse_pubmed_table`
+    """
+    return _table_rows(etree.fromstring(table_text), columnar)
+
+
+def parse_pubmed_table(path, return_xml=True, columnar=False):
     """
     Parse table from given Pubmed Open-Access XML file
+
+    Cells are read from the parsed tree. Cells spanning several rows or
+    columns (`rowspan`, `colspan`) are repeated in each row and column they
+    cover, so that all rows have one value per column and no row is left out.
+
+    Parameters
+    ----------
+    path: str, path or XML string, see `read_xml`
+    return_xml: bool, if True add `table_xml`, the XML of the table
+    columnar: bool, if True `table_values` is a list of columns, each a list
+        of the values of one column, instead of a list of rows
+
+    Returns
+    -------
+    table_dicts: list of dictionaries with `pmid`, `pmc`, `label`, `caption`,
+        `table_columns`, `table_values` and `table_xml`, None if there is no table
     """
     tree = read_xml(path)
-    dict_article_meta = parse_article_meta(tree)
+    return _parse_table_tree(tree, parse_article_meta(tree), return_xml, columnar)
+
+
+def _parse_table_tree(tree, dict_article_meta, return_xml=True, columnar=False):
     pmid = dict_article_meta['pmid']
     pmc = dict_article_meta['pmc']
 
     # parse table
-    tables = tree.xpath('.//body.//sec.//table-wrap')
+    tables = tree.xpath('.//body//sec//table-wrap')
     table_dicts = list()
     for table in tables:
         if table.find('label') is not None:
@@ -448,19 +590,162 @@ def parse_pubmed_table(path, return_xml=True):
             table_tree = None
 
         if table_tree is not None:
-            table_xml = etree.tostring(table_tree)
-            columns, row_values = table_to_df(table_xml)
-            if row_values is not None:
+            columns, values = _table_rows(table_tree, columnar)
+            if values is not None:
                 table_dict = {'pmid': pmid,
                               'pmc': pmc,
                               'label': label,
                               'caption': caption,
                               'table_columns': columns,
-                              'table_values': row_values}
+                              'table_values': values}
                 if return_xml:
-                    table_dict['table_xml'] = table_xml
+                    table_dict['table_xml'] = etree.tostring(table_tree)
                 table_dicts.append(table_dict)
     if len(table_dicts) >= 1:
         return table_dicts
     else:
         return None
+
+
+class _cached_property(object):
+    """Property computed on first access and then stored on the instance"""
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.func.__name__] = self.func(obj)
+        return value
+
+
+class OAArticle(object):
+    """
+    PubMed Open-Access article parsed once
+
+    The XML is read, and namespaces are stripped, when the object is
+    created. Each output of the `parse_pubmed_*` functions is computed on
+    first access from the same tree and cached, so extracting everything
+    from an article costs a single parse.
+
+    Parameters
+    ----------
+    path: str, path to the XML file, or an XML string
+    nxml: bool, strip namespaces even if `path` does not end with `.nxml`
+    all_paragraph: bool, keep paragraphs without references,
+        see `parse_pubmed_paragraph`
+    subscpt, supscpt: tuple, wrappers of subscripts and superscripts
+        in paragraphs, see `parse_pubmed_paragraph`
+    return_xml: bool, include the XML of tables, see `parse_pubmed_table`
+    columnar: bool, table values as columns, see `parse_pubmed_table`
+
+    Example
+    -------
+    >> article = pp.OAArticle('data/6605965a.nxml')
+    >> article.info['full_title'], len(article.references), len(article.paragraphs)
+    """
+
+    def __init__(self, path, nxml=False, all_paragraph=False, subscpt=None, supscpt=None, return_xml=True,
+                 columnar=False):
+        self.path = path
+        self.all_paragraph = all_paragraph
+        self.subscpt = subscpt
+        self.supscpt = supscpt
+        self.return_xml = return_xml
+        self.columnar = columnar
+        self.tree = read_xml(path, nxml)
+
+    @_cached_property
+    def meta(self):
+        """PMID, PMC, DOI and publisher ID, see `parse_article_meta`"""
+        return parse_article_meta(self.tree)
+
+    @_cached_property
+    def info(self):
+        """Article information, same as `parse_pubmed_xml`"""
+        return _parse_pubmed_xml_tree(self.tree, PUBMED_XML_FIELDS, self.meta)
+
+    @_cached_property
+    def references(self):
+        """Same as `parse_pubmed_references`"""
+        return _parse_references_tree(self.tree, self.meta)
+
+    @_cached_property
+    def paragraphs(self):
+        """Paragraphs of the body, same as `parse_pubmed_paragraph`"""
+        return _parse_paragraph_tree(self.tree, self.meta, self.all_paragraph, 'body',
+                                     self.subscpt, self.supscpt)
+
+    @_cached_property
+    def abstract_paragraphs(self):
+        """Paragraphs of the abstract, `parse_pubmed_paragraph` with `section='abs'`"""
+        return _parse_paragraph_tree(self.tree, self.meta, self.all_paragraph, 'abs',
+                                     self.subscpt, self.supscpt)
+
+    @_cached_property
+    def captions(self):
+        """Same as `parse_pubmed_caption`"""
+        return _parse_caption_tree(self.tree, self.meta)
+
+    @_cached_property
+    def tables(self):
+        """Same as `parse_pubmed_table`"""
+        return _parse_table_tree(self.tree, self.meta, self.return_xml, self.columnar)
+
+
+def _iter_tarball_members(path, select=None):
+    """Yield (member name, bytes) of XML files in a tar archive read as a stream"""
+    with tarfile.open(path, 'r|*') as tar:
+        for member in tar:
+            if not member.isfile() or os.path.splitext(member.name)[-1] not in ('.nxml', '.xml'):
+                continue
+            if select is not None and not select(member.name):
+                continue
+            yield member.name, tar.extractfile(member).read()
+
+
+def _parse_tarball_member(member, parser, kwargs):
+    name, data = member
+    return parser(data, **kwargs)
+
+
+def iter_oa_tarball(path, parser=parse_pubmed_xml, n_jobs=1, ordered=True, max_pending=None,
+                    select=None, **kwargs):
+    """
+    Parse articles of a PubMed Open-Access bulk archive without extracting it
+
+    The archive, e.g. `non_comm_use.A-B.xml.tar.gz`, is read sequentially
+    as a stream and each `.nxml` member is passed to `parser` as bytes.
+
+    Parameters
+    ----------
+    path: str, path to a tar archive, gzipped or not
+    parser: callable, function parsing one article given as bytes, such as
+        `parse_pubmed_xml`, `parse_pubmed_references`, `parse_pubmed_paragraph`,
+        `parse_pubmed_caption` or `parse_pubmed_table`
+    n_jobs: int, default 1, number of processes parsing members. Members
+        are read in the calling process and sent to the workers
+    ordered: bool, if True yield results in archive order, see `imap_bounded`
+    max_pending: int, maximum number of members being parsed or waiting
+        to be consumed, see `imap_bounded`
+    select: callable, optional function of a member name, members for
+        which it returns False are skipped without being parsed
+    kwargs: passed to `parser`, e.g. `fields` of `parse_pubmed_xml`
+
+    Yields
+    ------
+    (name, result): tuple of member name, e.g. 'Cells/PMC3350398.nxml',
+        and output of `parser`
+
+    Example
+    -------
+    >> for name, refs in pp.iter_oa_tarball('non_comm_use.A-B.xml.tar.gz',
+    >>                                      parser=pp.parse_pubmed_references, n_jobs=8):
+    >>     ...
+    """
+    parse_member = partial(_parse_tarball_member, parser=parser, kwargs=kwargs)
+    members = _iter_tarball_members(path, select=select)
+    for (name, _), result in imap_bounded(parse_member, members, n_jobs=n_jobs,
+                                          ordered=ordered, max_pending=max_pending):
+        yield name, result
@@ -1,22 +1,29 @@
 import sys
 import re
 import time
-import requests
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from lxml import etree
 from lxml import html
 from unidecode import unidecode
-try:
-    from urllib.request import urlopen
-except ImportError:
-    from urllib2 import urlopen
 from .utils import stringify_children
+from .web_client import get_web_client
 
 __all__ = [
     'parse_xml_web',
+    'parse_xml_web_batch',
     'parse_citation_web',
-    'parse_outgoing_citation_web'
+    'iter_citation_web',
+    'parse_outgoing_citation_web',
+    'aparse_xml_web',
+    'aparse_citation_web',
+    'aparse_outgoing_citation_web'
 ]
 
+EFETCH_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+CITEDBY_URL = 'http://www.ncbi.nlm.nih.gov/pmc/articles/%s/citedby/'
+
 
 def load_xml(pmid, sleep=None):
     """
@@ -24,8 +31,7 @@ def load_xml(pmid, sleep=None):
     return a dictionary for given pmid and xml string from the site
     sleep: how much time we want to wait until requesting new xml
     """
-    link = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=pubmed&retmode=xml&id=%s" % str(pmid)
-    page = requests.get(link)
+    page = get_web_client().get(EFETCH_URL, params={'db': 'pubmed', 'retmode': 'xml', 'id': str(pmid)})
     tree = html.fromstring(page.content)
     if sleep is not None:
         time.sleep(sleep)
@@ -34,26 +40,27 @@ def load_xml(pmid, sleep=None):
 
 def parse_pubmed_web_tree(tree):
     """
-    Giving tree, return simple parsed information from the tree
+    Giving tree, return simple parsed information from the tree.
+    The tree can also be a single `pubmedarticle` element of a larger tree
     """
 
-    if len(tree.xpath('//articletitle')) != 0:
-        title = ' '.join([title.text for title in tree.xpath('//articletitle')])
-    elif len(tree.xpath('//booktitle')) != 0:
-        title = ' '.join([title.text for title in tree.xpath('//booktitle')])
+    if len(tree.xpath('.//articletitle')) != 0:
+        title = ' '.join([title.text for title in tree.xpath('.//articletitle')])
+    elif len(tree.xpath('.//booktitle')) != 0:
+        title = ' '.join([title.text for title in tree.xpath('.//booktitle')])
     else:
         title = ''
 
-    abstract_tree = tree.xpath('//abstract/abstracttext')
+    abstract_tree = tree.xpath('.//abstract/abstracttext')
     abstract = ' '.join([stringify_children(a).strip() for a in abstract_tree])
 
-    if len(tree.xpath('//article//title')) != 0:
-        journal = ';'.join([t.text.strip() for t in tree.xpath('//article//title')])
+    if len(tree.xpath('.//article//title')) != 0:
+        journal = ';'.join([t.text.strip() for t in tree.xpath('.//article//title')])
     else:
         journal = ''
 
-    pubdate = tree.xpath('//pubmeddata//history//pubmedpubdate[@pubstatus="medline"]')
-    pubdatebook = tree.xpath('//pubmedbookdata//history//pubmedpubdate[@pubstatus="medline"]')
+    pubdate = tree.xpath('.//pubmeddata//history//pubmedpubdate[@pubstatus="medline"]')
+    pubdatebook = tree.xpath('.//pubmedbookdata//history//pubmedpubdate[@pubstatus="medline"]')
     if len(pubdate) >= 1 and pubdate[0].find('year') is not None:
         year = pubdate[0].find('year').text
     elif len(pubdatebook) >= 1 and pubdatebook[0].find('year') is not None:
@@ -62,12 +69,12 @@ def parse_pubmed_web_tree(tree):
         year = ''
 
     affiliations = list()
-    if tree.xpath('//affiliationinfo/affiliation') is not None:
-        for affil in tree.xpath('//affiliationinfo/affiliation'):
+    if tree.xpath('.//affiliationinfo/affiliation') is not None:
+        for affil in tree.xpath('.//affiliationinfo/affiliation'):
             affiliations.append(affil.text)
     affiliations_text = '; '.join(affiliations)
 
-    authors_tree = tree.xpath('//authorlist/author')
+    authors_tree = tree.xpath('.//authorlist/author')
     authors = list()
     if authors_tree is not None:
         for a in authors_tree:
@@ -82,8 +89,8 @@ def parse_pubmed_web_tree(tree):
         authors_text = ''
 
     keywords = ''
-    keywords_mesh = tree.xpath('//meshheadinglist//meshheading')
-    keywords_book = tree.xpath('//keywordlist//keyword')
+    keywords_mesh = tree.xpath('.//meshheadinglist//meshheading')
+    keywords_book = tree.xpath('.//keywordlist//keyword')
     if len(keywords_mesh) > 0:
         mesh_terms_list = []
         for m in keywords_mesh:
@@ -98,7 +105,7 @@ def parse_pubmed_web_tree(tree):
         keywords = ''
 
     doi = ''
-    article_ids = tree.xpath('//articleidlist//articleid')
+    article_ids = tree.xpath('.//articleidlist//articleid')
     if len(article_ids) >= 1:
         for article_id in article_ids:
             if article_id.attrib.get('idtype') == 'doi':
@@ -128,6 +135,47 @@ def parse_xml_web(pmid, sleep=None, save_xml=False):
     return dict_out
 
 
+def _article_pmid(article):
+    """PMID of a `pubmedarticle` or `pubmedbookarticle` element, the first PMID in it"""
+    pmid = article.find('.//pmid')
+    return pmid.text.strip() if pmid is not None and pmid.text else ''
+
+
+def parse_xml_web_batch(pmids, batch_size=200, sleep=None, save_xml=False):
+    """
+    Give list of pmids, load and parse xml from Pubmed eutils
+    with one request per `batch_size` pmids
+
+    Parameters
+    ----------
+    pmids: list of str or int
+    batch_size: int, number of pmids requested at once
+    sleep: float, seconds to wait after each request
+    save_xml: bool, if True save xml of each article in dictionary
+
+    Returns
+    -------
+    dicts_out: list of dictionaries in the order of `pmids`, with the keys
+        of `parse_xml_web`, None for pmids not returned by eutils
+    """
+    pmids = [str(pmid).strip() for pmid in pmids]
+    dicts_by_pmid = dict()
+    for start in range(0, len(pmids), batch_size):
+        batch = pmids[start:start + batch_size]
+        # POST as eutils recommends for long lists of ids
+        page = get_web_client().post(EFETCH_URL, data={'db': 'pubmed', 'retmode': 'xml', 'id': ','.join(batch)})
+        tree = html.fromstring(page.content)
+        for article in tree.xpath('//pubmedarticle | //pubmedbookarticle'):
+            dict_out = parse_pubmed_web_tree(article)
+            dict_out['pmid'] = _article_pmid(article)
+            if save_xml:
+                dict_out['xml'] = etree.tostring(article)
+            dicts_by_pmid[dict_out['pmid']] = dict_out
+        if sleep is not None:
+            time.sleep(sleep)
+    return [dicts_by_pmid.get(pmid) for pmid in pmids]
+
+
 def extract_citations(tree):
     """
     Extract number of citations from given tree
@@ -162,7 +210,7 @@ def convert_document_id(doc_id, id_type='PMC'):
     else:
         raise ValueError('Give id_type from PMC or PMID or DOI or OTHER')
 
-    convert_page = requests.get(convert_link)
+    convert_page = get_web_client().get(convert_link)
     convert_tree = html.fromstring(convert_page.content)
     record = convert_tree.find('record').attrib
     if 'status' in record or 'pmcid' not in record:
@@ -177,7 +225,41 @@ def convert_document_id(doc_id, id_type='PMC'):
             'doi': record['doi'] if 'doi' in record else ''}
 
 
-def parse_citation_web(doc_id, id_type='PMC'):
+def _load_citedby_page(pmc, page=1):
+    """Tree of a page of the list of articles citing `pmc`, 30 articles per page"""
+    params = {'page': str(page)} if page > 1 else None
+    response = get_web_client().get(CITEDBY_URL % pmc, params=params)
+    return html.fromstring(response.content)
+
+
+def _extract_citedby_pmc(tree):
+    """PMCs listed on a cited-by page"""
+    citations = tree.xpath('//div[@class="rprt"]/div[@class="title"]/a/@href')[1::]
+    return list(map(extract_pmc, citations))
+
+
+def _iter_citedby_pmc(pmc, tree, max_workers=4, ordered=True):
+    """
+    Yield PMCs of the first cited-by page `tree`, then of the other pages
+    fetched by up to `max_workers` threads, in page order if `ordered`
+    """
+    for pmc_cited in _extract_citedby_pmc(tree):
+        yield pmc_cited
+    n_pages = int(extract_citations(tree)/30) + 1
+    if n_pages < 2:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_load_citedby_page, pmc, i) for i in range(2, n_pages+1)]
+        try:
+            for future in (futures if ordered else as_completed(futures)):
+                for pmc_cited in _extract_citedby_pmc(future.result()):
+                    yield pmc_cited
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def parse_citation_web(doc_id, id_type='PMC', max_workers=4):
     """
     Parse citations from given document id
 
@@ -185,6 +267,8 @@ def parse_citation_web(doc_id, id_type='PMC'):
     ----------
     doc_id: str or int, document id
     id_type: str from ['PMC', 'PMID', 'DOI', 'OTHER']
+    max_workers: int, number of pages of citations fetched at once, after
+        the first one, within the rate limit of the web client
 
     Returns
     -------
@@ -198,25 +282,12 @@ def parse_citation_web(doc_id, id_type='PMC'):
 
     doc_id_dict = convert_document_id(doc_id, id_type=id_type)
     pmc = doc_id_dict['pmc']
-    link = "http://www.ncbi.nlm.nih.gov/pmc/articles/%s/citedby/" % pmc
-    page = requests.get(link)
-    tree = html.fromstring(page.content)
+    tree = _load_citedby_page(pmc)
     n_citations = extract_citations(tree)
-    n_pages = int(n_citations/30) + 1
 
-    pmc_cited_all = list() # all PMC cited
-    citations = tree.xpath('//div[@class="rprt"]/div[@class="title"]/a/@href')[1::]
-    pmc_cited = list(map(extract_pmc, citations))
-    pmc_cited_all.extend(pmc_cited)
-    if n_pages >= 2:
-        for i in range(2, n_pages+1):
-            link = "http://www.ncbi.nlm.nih.gov/pmc/articles/%s/citedby/?page=%s" % (pmc, str(i))
-            page = requests.get(link)
-            tree = html.fromstring(page.content)
-            citations = tree.xpath('//div[@class="rprt"]/div[@class="title"]/a/@href')[1::]
-            pmc_cited = list(map(extract_pmc, citations))
-            pmc_cited_all.extend(pmc_cited)
-    pmc_cited_all = [p for p in pmc_cited_all if p is not pmc]
+    pmc_digits = pmc.replace('PMC', '')  # cited-by PMCs are extracted without the prefix
+    pmc_cited_all = list(_iter_citedby_pmc(pmc, tree, max_workers=max_workers)) # all PMC cited
+    pmc_cited_all = [p for p in pmc_cited_all if p != pmc_digits]
     dict_out = {'n_citations': n_citations,
                 'pmid': doc_id_dict['pmid'],
                 'pmc': re.sub('PMC', '', doc_id_dict['pmc']),
@@ -225,6 +296,32 @@ def parse_citation_web(doc_id, id_type='PMC'):
     return dict_out
 
 
+def iter_citation_web(doc_id, id_type='PMC', max_workers=4, ordered=True):
+    """
+    Yield PMCs of the articles citing given document id as pages of
+    citations arrive, see `parse_citation_web`
+
+    Parameters
+    ----------
+    doc_id: str or int, document id
+    id_type: str from ['PMC', 'PMID', 'DOI', 'OTHER']
+    max_workers: int, number of pages of citations fetched at once
+    ordered: bool, if True yield PMCs in page order, otherwise yield the
+        PMCs of each page as soon as it arrives
+
+    Example
+    -------
+    >> for pmc in pp.iter_citation_web('3166277'):
+    >>     print(pmc)
+    """
+    pmc = convert_document_id(doc_id, id_type=id_type)['pmc']
+    pmc_digits = pmc.replace('PMC', '')
+    tree = _load_citedby_page(pmc)
+    for pmc_cited in _iter_citedby_pmc(pmc, tree, max_workers=max_workers, ordered=ordered):
+        if pmc_cited != pmc_digits:
+            yield pmc_cited
+
+
 def parse_outgoing_citation_web(doc_id, id_type='PMC'):
     """
     Load citations from NCBI eutils API for a given document,
@@ -245,9 +342,8 @@ def parse_outgoing_citation_web(doc_id, id_type='PMC'):
         raise ValueError('Unsupported id_type `%s`' % id_type)
     link = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/elink.fcgi?dbfrom=%s&linkname=%s&id=%s' % (db, linkname, doc_id)
 
-    parser = etree.XMLParser()
-    with urlopen(link) as f:
-        tree = etree.parse(f, parser)
+    page = get_web_client().get(link)
+    tree = etree.fromstring(page.content).getroottree()
     pmid_cited_all = tree.xpath('/eLinkResult/LinkSet/LinkSetDb/Link/Id/text()')
     n_citations = len(pmid_cited_all)
     if not n_citations: # If there are no citations, likely a bad doc_id
@@ -256,4 +352,100 @@ def parse_outgoing_citation_web(doc_id, id_type='PMC'):
                 'doc_id': doc_id,
                 'id_type': id_type,
                 'pmid_cited': pmid_cited_all}
-    return dict_out
\ No newline at end of file
+    return dict_out
+
+
+async def _amap_completed(func, items, concurrency):
+    """
+    Run `func` on `items` in a pool of `concurrency` threads, keeping at
+    most `concurrency` calls in flight, and yield (item, result) as calls
+    complete. Requests of all threads go through the shared web client
+    so they stay within its rate limit
+
+    A call raising an exception does not stop the others, the exception is
+    yielded in place of its result, as with `asyncio.gather(...,
+    return_exceptions=True)`
+    """
+    loop = asyncio.get_event_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    items = iter(items)
+    pending = dict()
+
+    def submit_next():
+        for item in items:
+            pending[loop.run_in_executor(executor, func, item)] = item
+            return True
+        return False
+
+    try:
+        while len(pending) < concurrency and submit_next():
+            pass
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                submit_next()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                yield item, result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def aparse_xml_web(pmids, concurrency=10, sleep=None, save_xml=False):
+    """
+    Asynchronous `parse_xml_web` of many pmids with up to `concurrency`
+    requests in flight
+
+    Parameters
+    ----------
+    pmids: iterable of str or int
+    concurrency: int, maximum number of requests in flight
+    sleep, save_xml: see `parse_xml_web`
+
+    Yields
+    ------
+    (pmid, dict_out): tuple, in the order requests complete, `dict_out` is
+        the exception raised if the request of `pmid` failed
+
+    Example
+    -------
+    >> async for pmid, dict_out in pp.aparse_xml_web(pmids, concurrency=10):
+    >>     if not isinstance(dict_out, Exception):
+    >>         print(pmid, dict_out['title'])
+    """
+    return _amap_completed(partial(parse_xml_web, sleep=sleep, save_xml=save_xml),
+                           pmids, concurrency)
+
+
+def aparse_citation_web(doc_ids, id_type='PMC', concurrency=10):
+    """
+    Asynchronous `parse_citation_web` of many document ids with up to
+    `concurrency` requests in flight
+
+    Yields
+    ------
+    (doc_id, dict_out): tuple, in the order requests complete, `dict_out`
+        is the exception raised if the request of `doc_id` failed
+    """
+    return _amap_completed(partial(parse_citation_web, id_type=id_type),
+                           doc_ids, concurrency)
+
+
+def aparse_outgoing_citation_web(doc_ids, id_type='PMC', concurrency=10):
+    """
+    Asynchronous `parse_outgoing_citation_web` of many document ids with up
+    to `concurrency` requests in flight
+
+    Yields
+    ------
+    (doc_id, dict_out): tuple, in the order requests complete,
+        `dict_out` is None if no citation is found, or the exception raised
+        if the request of `doc_id` failed
+    """
+    return _amap_completed(partial(parse_outgoing_citation_web, id_type=id_type),
+                           doc_ids, concurrency)
@@ -1,5 +1,19 @@
+import io
+import os
+import zlib
 import calendar
 import collections
+import gzip
+import threading
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
 from time import strptime
 from six import string_types
 from lxml import etree
@@ -19,52 +33,284 @@ def remove_namespace(tree):
             node.tag = node.tag.split('}', 1)[1]
 
 
-def read_xml(path, nxml=False):
+class ThreadedGzipReader(object):
     """
-    Parse tree from given XML path
+    Binary file object decompressing a gzip file in a background thread
+
+    The thread reads and inflates the file into a bounded queue of chunks
+    while the consumer, typically the XML parser, reads from the queue.
+    zlib releases the GIL while inflating so decompression and parsing
+    overlap on different cores.
+
+    Parameters
+    ----------
+    path: str, path to a gzip file, possibly with multiple members
+    chunk_size: int, number of compressed bytes read at once
+    max_chunks: int, maximum number of decompressed chunks waiting
+        to be read, this bounds memory use
     """
-    try:
-        tree = etree.parse(path)
-    except:
+    def __init__(self, path, chunk_size=256 * 1024, max_chunks=16):
+        self.name = path
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = b''
+        self._offset = 0
+        self._eof = False
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._inflate)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _inflate(self):
         try:
-            tree = etree.fromstring(path)
-        except Exception:
-            print("Error: it was not able to read a path, a file-like object, or a string as an XML")
-            raise
-    if '.nxml' in path or nxml:
-        remove_namespace(tree) # strip namespace for
-    return tree
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            started = False  # whether `decompressor` was given any data
+            with open(self.name, 'rb') as f:
+                while not self._closed.is_set():
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        break
+                    chunks = list()
+                    while data:
+                        if decompressor.eof:
+                            # after a member: another member or zero padding, as gzip allows
+                            data = data.lstrip(b'\x00')
+                            if not data:
+                                break
+                            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        started = True
+                        chunks.append(decompressor.decompress(data))
+                        data = decompressor.unused_data
+                    chunk = b''.join(chunks)
+                    if chunk:
+                        self._put(chunk)
+            if started and not decompressor.eof and not self._closed.is_set():
+                raise EOFError('Compressed file ended before the end-of-stream marker was reached')
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def _next_chunk(self):
+        chunk = self._queue.get()
+        if chunk is None:
+            self._eof = True
+        elif isinstance(chunk, Exception):
+            self._eof = True
+            raise chunk
+        else:
+            self._buffer = chunk
+            self._offset = 0
+
+    def read(self, size=-1):
+        """
+        Read up to `size` bytes, at most one decompressed chunk at a time
+        to avoid copies. Return empty bytes at the end of the file
+        """
+        if size is None or size < 0:
+            parts = [self._buffer[self._offset:]]
+            while not self._eof:
+                self._next_chunk()
+                if not self._eof:
+                    parts.append(self._buffer)
+            self._buffer, self._offset = b'', 0
+            return b''.join(parts)
+        while self._offset >= len(self._buffer):
+            if self._eof:
+                return b''
+            self._next_chunk()
+        data = self._buffer[self._offset:self._offset + size]
+        self._offset += len(data)
+        return data
+
+    def close(self):
+        self._closed.set()
+        self._thread.join()
 
+    def __enter__(self):
+        return self
 
-def stringify_children(node,subscpt = None, supscpt = None):
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def is_gzip(path):
     """
-    Filters and removes possible Nones in texts and tails
-    ref: http://stackoverflow.com/questions/4624062/get-all-text-inside-a-tag-in-lxml
+    Check if the file at given path starts with the gzip magic number
     """
+    with open(path, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+def open_xml(path):
+    """
+    Open XML file from given path as a binary file object,
+    decompressing it on the fly if it is gzipped. Decompression runs in
+    a background thread (see `ThreadedGzipReader`) when more than one
+    CPU is available to overlap it with parsing
+    """
+    if is_gzip(path):
+        if (os.cpu_count() or 1) > 1:
+            return ThreadedGzipReader(path)
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_source(source):
+    """
+    Parse with `iterparse` listening only to namespace declarations, so
+    that namespaces used anywhere in the document are known after parsing
+
+    Returns
+    -------
+    (root, namespaces): root element and set of declared namespace URIs
+    """
+    context = etree.iterparse(source, events=('start-ns',))
+    namespaces = set(uri for _, (prefix, uri) in context if uri)
+    return context.root, namespaces
+
+
+def _strip_namespaces(root, namespaces):
+    """Remove namespace from tags of elements in any of `namespaces`"""
+    if not namespaces:
+        return
+    for node in root.iter(*['{%s}*' % uri for uri in namespaces]):
+        node.tag = node.tag.split('}', 1)[1]
+
+
+def read_xml(path, nxml=False):
+    """
+    Parse tree from given XML path, string, bytes or file object
+
+    Parameters
+    ----------
+    path: str, bytes or file object. A path to an XML file, gzipped or not,
+        an XML string or bytes, or a binary file object such as a member of
+        a tar archive opened with `TarFile.extractfile`
+    nxml: bool, strip namespaces from tags. Namespaces are also stripped
+        from paths containing `.nxml` and from JATS articles, i.e.
+        PubMed Open-Access XML, whose root element is `article`
+
+    Returns
+    -------
+    tree: ElementTree
+    """
+    if isinstance(path, bytes) and not path.lstrip().startswith(b'<'):
+        path = path.decode('utf-8')  # file name given as bytes
+    if hasattr(path, 'read'):
+        root, namespaces = _parse_source(path)
+    elif isinstance(path, bytes):
+        root, namespaces = _parse_source(io.BytesIO(path))
+    elif path.lstrip().startswith('<'):
+        root, namespaces = _parse_source(io.BytesIO(path.encode('utf-8')))
+    else:
+        nxml = nxml or '.nxml' in path
+        if os.path.isfile(path) and is_gzip(path):
+            with open_xml(path) as f:
+                root, namespaces = _parse_source(f)
+        else:
+            root, namespaces = _parse_source(path)
+    if nxml or _local_name(root.tag) == 'article':
+        _strip_namespaces(root, namespaces)
+    return etree.ElementTree(root)
 
-    if subscpt or supscpt:
-        if not subscpt:
-            subscpt = ["",""]
-        if not supscpt:
-            supscpt = ["",""]
-
-        asstring = etree.tostring(node).decode("utf-8")
-        
-        if "<sub " in asstring or "<sub>" in asstring:
-            asstring = asstring.replace("<sub>", subscpt[0])
-            asstring=re.sub(r"<sub .*?>", subscpt[0], asstring)
-            asstring = asstring.replace("</sub>", subscpt[1])
-        if "<sup " in asstring or "<sup>" in asstring:
-            asstring = asstring.replace("<sup>", supscpt[0])
-            asstring=re.sub(r"<sup .*?>", supscpt[0], asstring)
-            asstring = asstring.replace("</sup>", supscpt[1])
-        try:
-            node = etree.fromstring(asstring)
-        except:
-            a=1
 
+# element names rendered with the same wrapper, MEDLINE uses <i> and <b>
+_WRAPPER_ALIASES = {'i': 'italic', 'b': 'bold'}
+# marks elements whose content is left out
+_SKIP = object()
+# MathML scripts rendered with the `sub` and `sup` wrappers, base first
+_MATHML_SCRIPTS = {
+    'msub': (None, 'sub'),
+    'msup': (None, 'sup'),
+    'msubsup': (None, 'sub', 'sup')
+}
 
-    return ''.join(node.itertext())
+
+def _render_children(node, wrappers, parts):
+    """Append text of `node` and its descendants in document order, like `itertext`"""
+    if node.text:
+        parts.append(node.text)
+    for child in node:
+        if isinstance(child.tag, string_types):
+            _render_element(child, wrappers, parts)
+        elif child.tag is etree.Entity:
+            parts.append(child.text)
+        # text of comments and processing instructions is skipped
+        if child.tail:
+            parts.append(child.tail)
+
+
+def _render_element(node, wrappers, parts, name=None):
+    if name is None:
+        name = _local_name(node.tag)
+        name = _WRAPPER_ALIASES.get(name, name)
+    wrapper = wrappers.get(name)
+    if wrapper is _SKIP:
+        return
+    scripts = _MATHML_SCRIPTS.get(name)
+    if scripts is not None and len(node) == len(scripts):
+        if node.text:
+            parts.append(node.text)
+        for script, child in zip(scripts, node):
+            _render_element(child, wrappers, parts, script)
+            if child.tail:
+                parts.append(child.tail)
+        return
+    if wrapper is None or (not node.text and not len(node)):
+        _render_children(node, wrappers, parts)
+    else:
+        parts.append(wrapper[0])
+        _render_children(node, wrappers, parts)
+        parts.append(wrapper[1])
+
+
+def stringify_children(node, subscpt=None, supscpt=None, wrappers=None, skip=None):
+    """
+    Text of a node and all its descendants, without the tail of the node
+
+    Parameters
+    ----------
+    node: Element
+    subscpt: tuple, (opening, closing) strings put around subscripts,
+        e.g. ('_{', '}'), also used for MathML `msub` and `msubsup`
+    supscpt: tuple, (opening, closing) strings put around superscripts,
+        e.g. ('^{', '}'), also used for MathML `msup` and `msubsup`
+    wrappers: dict, (opening, closing) strings by element name, `italic`
+        and `bold` also apply to MEDLINE `i` and `b`,
+        e.g. {'italic': ('*', '*'), 'bold': ('**', '**')}
+    skip: tuple, names of descendant elements whose text is left out,
+        e.g. ('fig', 'table-wrap'). Their tail is kept
+
+    Returns
+    -------
+    text: str
+    """
+    if skip and next(node.iterdescendants(*skip), None) is None:
+        skip = None
+    if not (subscpt or supscpt or wrappers or skip):
+        return ''.join(node.itertext())
+    wrappers = dict(wrappers or {})
+    if subscpt:
+        wrappers['sub'] = subscpt
+    if supscpt:
+        wrappers['sup'] = supscpt
+    for name in skip or ():
+        wrappers[name] = _SKIP
+    parts = list()
+    _render_children(node, wrappers, parts)
+    return ''.join(parts)
 
 
 def stringify_affiliation(node):
@@ -93,7 +339,7 @@ def _flatten(l):
     Flatten list into one dimensional
     """
     for el in l:
-        if isinstance(el, collections.Iterable) and not isinstance(el, string_types):
+        if isinstance(el, Iterable) and not isinstance(el, string_types):
             for sub in _flatten(el):
                 yield sub
         else:
@@ -141,8 +387,117 @@ def month_or_day_formater(month_or_day):
     return ("0" if to_format < 10 else "") + str(to_format)
 
 
+# unicode spaces folded to a regular space by `TextNormalizer`
+UNICODE_SPACES = (u"\u0020\u00A0\u180E\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007"
+                  u"\u2008\u2009\u200A\u200B\u202F\u205F\u3000\uFEFF")
+_UNICODE_SPACE = re.compile(u'[%s]' % UNICODE_SPACES.replace(' ', ''))  # other than ' '
+_REPEATED_SPACES = re.compile(' {2,}')
+
+
+class TextNormalizer(object):
+    """
+    Callable cleaning text extracted from XML in a single pass per step
+
+    Most text is ASCII, which cannot contain unicode spaces, so folding
+    them is only attempted on non-ASCII text with one compiled pattern.
+
+    Parameters
+    ----------
+    fold_spaces: bool, replace unicode spaces such as no-break space by ' '
+    remove_newlines: bool, remove '\\n' characters
+    collapse_spaces: bool, replace runs of spaces by a single space
+    strip: bool, strip leading and trailing whitespace
+
+    Example
+    -------
+    >> normalize_text = TextNormalizer()
+    >> normalize_text(u'Structure\\n  of\\u00A0DNA ')
+    'Structure of DNA'
+    """
+    def __init__(self, fold_spaces=True, remove_newlines=True, collapse_spaces=True, strip=True):
+        self.fold_spaces = fold_spaces
+        self.remove_newlines = remove_newlines
+        self.collapse_spaces = collapse_spaces
+        self.strip = strip
+
+    def __call__(self, text):
+        if self.remove_newlines:
+            text = text.replace('\n', '')
+        if self.fold_spaces and not is_ascii(text):
+            text = _UNICODE_SPACE.sub(' ', text)
+        if self.collapse_spaces:
+            text = _REPEATED_SPACES.sub(' ', text)
+        if self.strip:
+            text = text.strip()
+        return text
+
+
+def is_ascii(text):
+    """True if `text` only has ASCII characters, so it needs no unicode folding"""
+    try:
+        return text.isascii()
+    except AttributeError:  # Python < 3.7
+        return all(ord(c) < 128 for c in text)
+
+
+# default normalization of titles, abstracts and paragraphs
+normalize_text = TextNormalizer()
+
+
 def pretty_print(node):
     """
     Pretty print a given lxml node
     """
-    print(etree.tostring(node, pretty_print=True).decode('utf-8'))
\ No newline at end of file
+    print(etree.tostring(node, pretty_print=True).decode('utf-8'))
+
+
+def imap_bounded(func, iterable, n_jobs=None, ordered=True, max_pending=None):
+    """
+    Apply `func` to each item of `iterable` over a pool of processes
+
+    At most `max_pending` items are submitted and not yet consumed at any
+    time, so results of a slow consumer do not pile up in memory.
+
+    Parameters
+    ----------
+    func: callable, picklable function of one argument
+    iterable: iterable of arguments to `func`
+    n_jobs: int, number of processes, defaults to the number of CPUs.
+        With `n_jobs=1` items are processed in the calling process
+    ordered: bool, if True yield results in the order of `iterable`,
+        otherwise yield them as soon as they are done
+    max_pending: int, maximum number of in-flight items, defaults to `2 * n_jobs`
+
+    Yields
+    ------
+    (item, result): tuple of an item of `iterable` and `func(item)`
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        for item in iterable:
+            yield item, func(item)
+        return
+
+    max_pending = max(max_pending or 2 * n_jobs, 1)
+    items = iter(iterable)
+    pending = collections.OrderedDict()
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        try:
+            while True:
+                for item in items:
+                    pending[executor.submit(func, item)] = item
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                if ordered:
+                    future, item = pending.popitem(last=False)
+                    yield item, future.result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
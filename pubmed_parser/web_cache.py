@@ -0,0 +1,189 @@
+"""
+Persistent cache of web parser responses in SQLite
+"""
+import time
+import sqlite3
+import hashlib
+import threading
+import requests
+try:
+    from urllib.parse import urlsplit, parse_qsl, urlencode
+except ImportError:
+    from urlparse import urlsplit, parse_qsl
+    from urllib import urlencode
+
+__all__ = [
+    'ResponseCache'
+]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content_type TEXT,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+DAY = 24 * 3600.
+# seconds a response stays fresh, by endpoint. Records and ID conversions
+# rarely change while lists of citing articles grow
+DEFAULT_TTLS = {
+    'efetch.fcgi': 30 * DAY,
+    'elink.fcgi': 7 * DAY,
+    'idconv': 30 * DAY,
+    'citedby': DAY,
+    None: DAY
+}
+
+# parameters left out of cache keys
+_IGNORED_PARAMS = ('api_key', 'tool', 'email')
+
+
+def _items(params):
+    if not params:
+        return []
+    if hasattr(params, 'items'):
+        params = params.items()
+    return [(str(k), str(v)) for k, v in params]
+
+
+def request_key(method, url, params=None, data=None):
+    """
+    Hash of a request normalized so that the same request gives the same
+    key whatever the order of its parameters and whether they are given in
+    the URL or in `params`. API keys and contact parameters are ignored
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + _items(params)
+    query = sorted((k, v) for k, v in query if k not in _IGNORED_PARAMS)
+    body = sorted((k, v) for k, v in _items(data) if k not in _IGNORED_PARAMS)
+    normalized = '%s %s://%s%s?%s %s' % (method.upper(), parts.scheme, parts.netloc.lower(),
+                                         parts.path or '/', urlencode(query), urlencode(body))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(object):
+    """
+    SQLite cache of successful HTTP responses of the web parsers
+
+    Pass it to `WebClient` so that repeated requests are answered from
+    disk without using the network or the rate limit. Responses expire
+    after a time to live chosen by endpoint, and least recently used
+    responses are evicted once the cache exceeds `max_size` bytes.
+
+    Parameters
+    ----------
+    path: str, path to the SQLite database, created if it does not exist
+    ttl: float or dict, seconds a response stays fresh. A dict maps a part
+        of the URL path, e.g. 'efetch.fcgi', to seconds, with key None for
+        other URLs, and is merged with `DEFAULT_TTLS`
+    max_size: int, maximum total size in bytes of cached responses
+    offline: bool, never use the network: serve cached responses even if
+        expired and raise `LookupError` for requests not cached
+
+    Example
+    -------
+    >> cache = pp.ResponseCache('pubmed_cache.db', ttl={'citedby': 3600})
+    >> pp.set_web_client(pp.WebClient(cache=cache))
+    """
+    def __init__(self, path, ttl=None, max_size=1024 ** 3, offline=False):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if isinstance(ttl, dict):
+            self.ttls.update(ttl)
+        elif ttl is not None:
+            self.ttls = {None: float(ttl)}
+        self.max_size = max_size
+        self.offline = offline
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(_SCHEMA)
+        self._size = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def ttl(self, url):
+        """Time to live of responses of `url`"""
+        path = urlsplit(url).path
+        for endpoint, ttl in self.ttls.items():
+            if endpoint is not None and endpoint in path:
+                return ttl
+        return self.ttls.get(None, DEFAULT_TTLS[None])
+
+    def get(self, method, url, params=None, data=None):
+        """
+        Cached response of a request, None if it is not cached or expired.
+        In offline mode expired responses are returned and `LookupError`
+        is raised if the request is not cached
+        """
+        key = request_key(method, url, params, data)
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT url, content_type, content, created FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (not self.offline and now - row[3] > self.ttl(url)):
+                if self.offline:
+                    raise LookupError('%s %s is not cached and the cache is offline' % (method, url))
+                return None
+            with self.connection:
+                self.connection.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        response = requests.Response()
+        response.status_code = 200
+        response.url = row[0]
+        response._content = bytes(row[2])
+        if row[1]:
+            response.headers['Content-Type'] = row[1]
+        return response
+
+    def put(self, method, url, response, params=None, data=None):
+        """Store a response and evict least recently used ones above `max_size`"""
+        key = request_key(method, url, params, data)
+        content = response.content
+        now = time.time()
+        with self._lock, self.connection:
+            old = self.connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url or url, response.headers.get('Content-Type'),
+                 sqlite3.Binary(content), len(content), now, now))
+            self._size += len(content) - (old[0] if old else 0)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used responses until the cache fits in 90% of `max_size`"""
+        target = 0.9 * self.max_size
+        cursor = self.connection.execute('SELECT key, size FROM responses ORDER BY accessed')
+        keys = list()
+        for key, size in cursor:
+            if self._size <= target:
+                break
+            keys.append((key,))
+            self._size -= size
+        self.connection.executemany('DELETE FROM responses WHERE key = ?', keys)
+
+    def clear(self):
+        """Delete all cached responses"""
+        with self._lock, self.connection:
+            self.connection.execute('DELETE FROM responses')
+            self._size = 0
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,185 @@
+"""
+HTTP client shared by the web parsers, with connection pooling,
+rate limiting and retries following NCBI usage guidelines
+"""
+import os
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+__all__ = [
+    'RateLimiter',
+    'WebClient',
+    'get_web_client',
+    'set_web_client'
+]
+
+
+# status codes of responses retried by `WebClient`
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class RateLimiter(object):
+    """
+    Thread-safe token bucket allowing `rate` calls per second on average
+    and bursts of up to `burst` calls
+
+    Parameters
+    ----------
+    rate: float, tokens added per second
+    burst: int, capacity of the bucket. The default of 1 spaces calls
+        `1 / rate` seconds apart, so no one-second window exceeds `rate`
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token, return 0 or the number of seconds to wait for one"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        wait = self._reserve()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._reserve()
+
+
+class WebClient(object):
+    """
+    HTTP client keeping connections alive between requests, limiting the
+    request rate and retrying failed requests
+
+    Requests failing with a connection error, a timeout or a status in
+    `RETRY_STATUS` are retried after a random delay of up to
+    `backoff * 2 ** attempt` seconds ("full jitter"), or after the delay
+    given by a `Retry-After` header.
+
+    Parameters
+    ----------
+    api_key: str, NCBI API key added to E-utilities requests, defaults to
+        the `NCBI_API_KEY` environment variable
+    rate: float, requests per second, defaults to 3, or 10 with an API key,
+        the limits of E-utilities
+    max_retries: int, number of retries of a failed request
+    backoff: float, base delay in seconds between retries
+    max_backoff: float, maximum delay in seconds between retries
+    timeout: float, seconds to wait for the server
+    pool_size: int, maximum number of connections kept alive per host
+    cache: ResponseCache, if given, responses are read from and stored in
+        the cache, and cached requests do not count toward the rate limit
+
+    Example
+    -------
+    >> pp.set_web_client(pp.WebClient(api_key='...'))
+    >> pp.parse_xml_web('17942999')
+    """
+    def __init__(self, api_key=None, rate=None, max_retries=5, backoff=0.5, max_backoff=30.,
+                 timeout=30., pool_size=10, cache=None):
+        self.api_key = api_key or os.environ.get('NCBI_API_KEY')
+        self.rate = rate or (10 if self.api_key else 3)
+        self.limiter = RateLimiter(self.rate)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass  # HTTP date, use backoff
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, params=None, data=None):
+        """
+        Send a request, waiting for the rate limiter, and retry it on failure.
+        Requests in the cache, if any, are answered from it
+
+        Returns
+        -------
+        response: requests.Response, the last response. An `HTTPError` is
+            raised if it still has a status in `RETRY_STATUS`
+        """
+        if self.cache is not None:
+            response = self.cache.get(method, url, params, data)
+            if response is not None:
+                return response
+        response = self._send(method, url, params, data)
+        if self.cache is not None and response.status_code == 200:
+            self.cache.put(method, url, response, params, data)
+        return response
+
+    def _send(self, method, url, params, data):
+        if self.api_key and '/entrez/eutils/' in url:
+            if method == 'POST':
+                data = dict(data or {}, api_key=self.api_key)
+            else:
+                params = dict(params or {}, api_key=self.api_key)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.request(method, url, params=params, data=data,
+                                                timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            if response.status_code not in RETRY_STATUS:
+                return response
+            if attempt < self.max_retries:
+                time.sleep(self._delay(attempt, response))
+        response.raise_for_status()
+
+    def get(self, url, params=None):
+        return self.request('GET', url, params=params)
+
+    def post(self, url, data=None):
+        return self.request('POST', url, data=data)
+
+    def close(self):
+        self.session.close()
+
+
+_web_client = None
+_web_client_lock = threading.Lock()
+
+
+def get_web_client():
+    """Client used by the web parsers, created on first use"""
+    global _web_client
+    with _web_client_lock:
+        if _web_client is None:
+            _web_client = WebClient()
+        return _web_client
+
+
+def set_web_client(client):
+    """
+    Use `client`, a `WebClient`, for all following requests of the web
+    parsers, e.g. to set an API key or other limits
+    """
+    global _web_client
+    with _web_client_lock:
+        _web_client = client
@@ -0,0 +1,274 @@
+"""
+Sinks to write parsed records to rolling JSON lines or Parquet files
+"""
+import os
+import io
+import gzip
+import json
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+__all__ = [
+    'JSONLWriter',
+    'ParquetWriter',
+    'write_records',
+    'record_to_json'
+]
+
+
+def _clean_value(value):
+    """Replace NaN, used for fields of deleted MEDLINE citations, by None"""
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _clean_record(record):
+    return {k: _clean_value(v) for k, v in record.items()}
+
+
+def record_to_json(record):
+    """
+    Serialize a parsed record as a line of JSON, without the newline.
+    NaN values, such as fields of deleted MEDLINE citations, become null
+    """
+    return json.dumps(_clean_record(record))
+
+
+def _widen_null(data_type):
+    """
+    Replace null types, inferred from columns or lists without any value,
+    by strings, also inside lists and structs, e.g. list<null> by list<string>
+    """
+    if pa.types.is_null(data_type):
+        return pa.string()
+    if pa.types.is_list(data_type) or pa.types.is_large_list(data_type):
+        value_type = _widen_null(data_type.value_type)
+        return pa.large_list(value_type) if pa.types.is_large_list(data_type) else pa.list_(value_type)
+    if pa.types.is_struct(data_type):
+        return pa.struct([f.with_type(_widen_null(f.type)) for f in data_type])
+    return data_type
+
+
+class _RollingWriter(object):
+    """
+    Base class of writers that split output over numbered shards
+    `<path_prefix>-00000.<extension>`, `<path_prefix>-00001.<extension>`, ...
+    and start a new shard once the current one reaches `max_file_size` bytes
+    """
+    extension = None
+
+    def __init__(self, path_prefix, max_file_size=None):
+        # create the output directory now, so that a bad path fails before parsing
+        os.makedirs(os.path.dirname(path_prefix) or '.', exist_ok=True)
+        self.path_prefix = path_prefix
+        self.max_file_size = max_file_size
+        self.paths = list()
+        self._file = None
+
+    def _shard_path(self):
+        return '%s-%05d.%s' % (self.path_prefix, len(self.paths), self.extension)
+
+    def _open_shard(self):
+        path = self._shard_path()
+        self.paths.append(path)
+        self._file = io.open(path, 'wb')
+
+    def _close_shard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _roll_if_full(self):
+        if self.max_file_size is not None and self._file.tell() >= self.max_file_size:
+            self._close_shard()
+
+    def write_many(self, records):
+        """Write an iterable of dictionaries"""
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self._close_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JSONLWriter(_RollingWriter):
+    """
+    Write records as JSON lines, gzip compressed by default
+
+    Parameters
+    ----------
+    path_prefix: str, prefix of output files, e.g. 'out/medline'
+    max_file_size: int, default 256 MB, approximate maximum size in bytes of
+        each file on disk. None writes a single file
+    compress: bool, if True write `.jsonl.gz` files, otherwise `.jsonl`
+
+    Example
+    -------
+    >> with JSONLWriter('out/medline') as writer:
+    >>     writer.write_many(pp.iter_medline_xml(path))
+    >> writer.paths
+    ['out/medline-00000.jsonl.gz']
+    """
+
+    def __init__(self, path_prefix, max_file_size=256 * 1024 ** 2, compress=True):
+        super(JSONLWriter, self).__init__(path_prefix, max_file_size)
+        self.compress = compress
+        self.extension = 'jsonl.gz' if compress else 'jsonl'
+        self._stream = None
+
+    def _open_shard(self):
+        super(JSONLWriter, self)._open_shard()
+        if self.compress:
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb')
+        else:
+            self._stream = self._file
+
+    def _close_shard(self):
+        if self._stream is not None and self._stream is not self._file:
+            self._stream.close()
+        self._stream = None
+        super(JSONLWriter, self)._close_shard()
+
+    def write(self, record):
+        """Write one dictionary as a JSON line"""
+        if self._file is None:
+            self._open_shard()
+        line = record_to_json(record) + '\n'
+        self._stream.write(line.encode('utf-8'))
+        self._roll_if_full()
+
+
+class ParquetWriter(_RollingWriter):
+    """
+    Write records to Parquet files, one row group per `row_group_size` records
+
+    At most `row_group_size` records are held in memory once the schema is
+    known. The schema is inferred unless given. While a column, or a list or
+    struct in it, has no value yet, e.g. lists of references that are all
+    empty, up to `MAX_INFER_ROW_GROUPS` row groups are held to infer its
+    type, after which columns still without value are written as strings.
+    Requires pyarrow.
+
+    Parameters
+    ----------
+    path_prefix: str, prefix of output files, e.g. 'out/medline'
+    max_file_size: int, default 512 MB, approximate maximum size in bytes
+        of each file, checked after each row group. None writes a single file
+    row_group_size: int, number of records per row group
+    schema: pyarrow.Schema, optional schema of the records
+    compression: str, Parquet compression codec
+    """
+    extension = 'parquet'
+    MAX_INFER_ROW_GROUPS = 10
+
+    def __init__(self, path_prefix, max_file_size=512 * 1024 ** 2, row_group_size=50000,
+                 schema=None, compression='snappy'):
+        if pa is None:
+            raise ImportError('pyarrow is required to write Parquet files, '
+                              'install it with `pip install pyarrow`')
+        super(ParquetWriter, self).__init__(path_prefix, max_file_size)
+        self.row_group_size = row_group_size
+        self.schema = schema
+        self.compression = compression
+        self._rows = list()
+        self._flush_size = row_group_size
+        self._parquet_writer = None
+
+    def _open_shard(self):
+        super(ParquetWriter, self)._open_shard()
+        self._parquet_writer = pq.ParquetWriter(self._file, self.schema, compression=self.compression)
+
+    def _close_shard(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        super(ParquetWriter, self)._close_shard()
+
+    def _infer_schema(self, schema):
+        return pa.schema([f.with_type(_widen_null(f.type)) for f in schema])
+
+    def write(self, record):
+        """Buffer one dictionary, writing a row group when the buffer is full"""
+        self._rows.append(_clean_record(record))
+        if len(self._rows) >= self._flush_size:
+            self._flush()
+
+    def write_batch(self, batch):
+        """Write a `pyarrow.RecordBatch` or `pyarrow.Table` as is"""
+        self.flush()
+        self._write_table(pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch)
+
+    def _write_table(self, table):
+        if self.schema is None:
+            self.schema = self._infer_schema(table.schema)
+        table = table.select(self.schema.names).cast(self.schema)
+        if self._file is None:
+            self._open_shard()
+        self._parquet_writer.write_table(table, row_group_size=self.row_group_size)
+        self._roll_if_full()
+
+    def _flush(self, force=False):
+        """
+        Write buffered records as row groups, unless the schema is still
+        inferred, some type is unknown and `force` is False
+        """
+        if not self._rows:
+            return
+        if self.schema is None:
+            schema = pa.Table.from_pylist(self._rows).schema
+            has_null = any(_widen_null(f.type) != f.type for f in schema)
+            if has_null and not force and \
+                    len(self._rows) < self.MAX_INFER_ROW_GROUPS * self.row_group_size:
+                self._flush_size = len(self._rows) + self.row_group_size
+                return
+            self.schema = self._infer_schema(schema)
+        rows = self._rows
+        self._rows = list()
+        self._flush_size = self.row_group_size
+        for start in range(0, len(rows), self.row_group_size):
+            self._write_table(pa.Table.from_pylist(rows[start:start + self.row_group_size], schema=self.schema))
+
+    def flush(self):
+        """Write buffered records as row groups"""
+        self._flush(force=True)
+
+    def close(self):
+        self.flush()
+        super(ParquetWriter, self).close()
+
+
+def write_records(records, path_prefix, output_format='jsonl', **kwargs):
+    """
+    Write an iterable of dictionaries to rolling JSON lines or Parquet files
+
+    Parameters
+    ----------
+    records: iterable of dict, e.g. from `iter_medline_xml`
+    path_prefix: str, prefix of output files
+    output_format: str, 'jsonl' or 'parquet'
+    kwargs: passed to `JSONLWriter` or `ParquetWriter`
+
+    Returns
+    -------
+    paths: list, paths of the written files
+    """
+    if output_format == 'jsonl':
+        writer = JSONLWriter(path_prefix, **kwargs)
+    elif output_format == 'parquet':
+        writer = ParquetWriter(path_prefix, **kwargs)
+    else:
+        raise ValueError('Give output_format from jsonl or parquet')
+    with writer:
+        writer.write_many(records)
+    return writer.paths
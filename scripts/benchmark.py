@@ -0,0 +1,107 @@
+"""
+Benchmark parsing throughput of pubmed_parser on the example data
+
+Usage
+-----
+    python scripts/benchmark.py [path_to_medline_xml_gz]
+"""
+import re
+import sys
+import glob
+import gzip
+import time
+import timeit
+from lxml import etree
+import pubmed_parser as pp
+from pubmed_parser.utils import read_xml, ThreadedGzipReader, UNICODE_SPACES, normalize_text, stringify_children
+from pubmed_parser.medline_parser import parse_article_info
+from pubmed_parser.pubmed_oa_parser import _table_rows
+
+
+def best_of(func, repeat=5):
+    """Return the fastest wall time in seconds of `repeat` calls to `func`"""
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_medline_extraction(path):
+    """Citations per second of `parse_article_info` on an already parsed tree"""
+    tree = read_xml(path)
+    medline_citations = tree.findall('.//MedlineCitation')
+    elapsed = best_of(lambda: [parse_article_info(m, True, False) for m in medline_citations])
+    print('parse_article_info: %.0f citations/sec' % (len(medline_citations) / elapsed))
+
+
+def benchmark_medline_file(path):
+    """Citations per second of `parse_medline_xml`, including reading the file"""
+    n_citations = len(pp.parse_medline_xml(path))
+    elapsed = best_of(lambda: pp.parse_medline_xml(path))
+    print('parse_medline_xml: %.0f citations/sec' % (n_citations / elapsed))
+
+
+def benchmark_gzip_reader(path):
+    """Seconds to parse a gzipped file with inline or background-thread decompression"""
+    elapsed = best_of(lambda: etree.parse(gzip.open(path, 'rb')))
+    print('etree.parse(gzip.open): %.3f sec' % elapsed)
+    elapsed = best_of(lambda: etree.parse(ThreadedGzipReader(path)))
+    print('etree.parse(ThreadedGzipReader): %.3f sec' % elapsed)
+
+
+def benchmark_stringify_children(path):
+    """Titles and abstracts per second rendered with subscript and superscript wrappers"""
+    tree = read_xml(path)
+    nodes = tree.findall('.//ArticleTitle') + tree.findall('.//AbstractText')
+    elapsed = best_of(lambda: [stringify_children(n, ('_{', '}'), ('^{', '}')) for n in nodes])
+    print('stringify_children with wrappers: %.0f nodes/sec' % (len(nodes) / elapsed))
+
+
+def benchmark_read_xml(path_dir='data'):
+    """Open-Access articles per second read by `read_xml`, which strips namespaces"""
+    paths = sorted(glob.glob(path_dir + '/*.nxml'))
+    elapsed = best_of(lambda: [read_xml(p) for p in paths])
+    print('read_xml: %.0f articles/sec' % (len(paths) / elapsed))
+
+
+def _replace_multiple_normalize(text):
+    """Former normalization, one `str.replace` per unicode space"""
+    for space in UNICODE_SPACES:
+        text = text.replace(space, ' ')
+    return re.sub(' +', ' ', text.replace('\n', '')).strip()
+
+
+def benchmark_normalize_text(number=20000):
+    """Microseconds per call of `normalize_text` and the former normalization"""
+    texts = {
+        'title': 'Structure of  the human\nDNA polymerase ',
+        'paragraph (ascii)': 'The quick brown fox\n jumps over  the lazy dog. ' * 40,
+        'paragraph (unicode)': u'The quick brown fox\n jumps over\u00A0the lazy d\u00F6g. ' * 40
+    }
+    for name, text in texts.items():
+        for func in (_replace_multiple_normalize, normalize_text):
+            elapsed = min(timeit.repeat(lambda: func(text), number=number, repeat=5))
+            print('%s on %s: %.2f us/call' % (getattr(func, '__name__', 'normalize_text'),
+                                                name, 1e6 * elapsed / number))
+
+
+def benchmark_parse_table(path_dir='data'):
+    """Table cells per second read from parsed Open-Access articles"""
+    tables = [table for p in sorted(glob.glob(path_dir + '/*.nxml'))
+              for table in read_xml(p).xpath('.//body//sec//table-wrap//table')]
+    n_cells = sum(len(table.xpath('.//td|.//th')) for table in tables)
+    elapsed = best_of(lambda: [_table_rows(table) for table in tables])
+    print('table cells: %.0f cells/sec' % (n_cells / elapsed))
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'data/medline16n0902.xml.gz'
+    benchmark_medline_extraction(path)
+    benchmark_medline_file(path)
+    benchmark_gzip_reader(path)
+    benchmark_stringify_children(path)
+    benchmark_read_xml()
+    benchmark_normalize_text()
+    benchmark_parse_table()
@@ -52,9 +52,13 @@ def process_file(date_update):
 
     date_update_str = date_update.strftime("%Y_%m_%d")
     path_rdd = sc.parallelize(glob(os.path.join(download_dir, 'medline*.xml.gz')), numSlices=1000)
-    parse_results_rdd = path_rdd.\
-        flatMap(lambda x: [Row(file_name=os.path.basename(x), **publication_dict)
-                           for publication_dict in pp.parse_medline_xml(x)])
+    # parse each file once for both articles and grants
+    parse_tables_rdd = path_rdd.\
+        map(lambda x: (os.path.basename(x), pp.parse_medline_tables(x, tables=['grants']))).\
+        cache()
+    parse_results_rdd = parse_tables_rdd.\
+        flatMap(lambda x: [Row(file_name=x[0], **publication_dict)
+                           for publication_dict in x[1]['articles']])
     medline_df = parse_results_rdd.toDF()
     medline_df.write.parquet(os.path.join(save_dir, 'medline_raw_%s.parquet' % date_update_str),
                              mode='overwrite')
@@ -70,12 +74,12 @@ def process_file(date_update):
                       mode='overwrite')
 
     # parse grant database
-    parse_grant_rdd = path_rdd.flatMap(lambda x: pp.parse_medline_grant_id(x))\
-        .filter(lambda x: x is not None)\
+    parse_grant_rdd = parse_tables_rdd.flatMap(lambda x: x[1]['grants'])\
         .map(lambda x: Row(**x))
     grant_df = parse_grant_rdd.toDF()
     grant_df.write.parquet(os.path.join(save_dir, 'medline_grant_%s.parquet' % date_update_str),
                            mode='overwrite')
+    parse_tables_rdd.unpersist()
 
 conf = SparkConf().setAppName('medline_spark')\
     .setMaster('local[8]')\
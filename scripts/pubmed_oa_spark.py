@@ -12,7 +12,7 @@ from utils import get_update_date
 # directory
 home_dir = os.path.expanduser('~')
 download_dir = os.path.join(home_dir, 'Downloads')
-unzip_dir = os.path.join(download_dir, 'pubmed_oa') # path to unzip tar file
+tar_path = os.path.join(download_dir, 'non_comm_use.A-B.xml.tar.gz') # parsed without extracting
 save_dir = os.path.join(home_dir, 'Desktop')
 
 def parse_name(p):
@@ -54,10 +54,8 @@ def update():
         if is_update:
             print("MEDLINE update available!")
             subprocess.call(['rm', '-rf', os.path.join(save_dir, 'pubmed_oa_*_*_*.parquet')]) # remove
-            subprocess.call(['rm', '-rf', download_dir, 'pubmed_oa'])
+            subprocess.call(['rm', '-f', tar_path])
             subprocess.call(['wget', 'ftp://ftp.ncbi.nlm.nih.gov/pub/pmc/oa_bulk/non_comm_use.A-B.xml.tar.gz', '--directory', download_dir])
-            if not os.path.isdir(unzip_dir): os.mkdir(unzip_dir)
-            subprocess.call(['tar', '-xzf', os.path.join(download_dir, 'non_comm_use.A-B.xml.tar.gz'), '--directory', unzip_dir])
         else:
             print("No update available")
     else:
@@ -65,29 +63,28 @@ def update():
         is_update = True
         date_update = get_update_date(option='oa')
         subprocess.call(['wget', 'ftp://ftp.ncbi.nlm.nih.gov/pub/pmc/oa_bulk/non_comm_use.A-B.xml.tar.gz', '--directory', download_dir])
-        if not os.path.isdir(unzip_dir): os.mkdir(unzip_dir)
-        subprocess.call(['tar', '-xzf', os.path.join(download_dir, 'non_comm_use.A-B.xml.tar.gz'), '--directory', unzip_dir])
     return is_update, date_update
 
 def process_file(date_update, fraction=0.01):
-    """Process unzipped Pubmed Open-Access folder to parquet file"""
+    """Process Pubmed Open-Access archive to parquet file"""
     print("Process Pubmed Open-Access file to parquet with fraction = %s" % str(fraction))
     date_update_str = date_update.strftime("%Y_%m_%d")
     if glob(os.path.join(save_dir, 'pubmed_oa_*.parquet')):
         subprocess.call(['rm', '-rf', 'pubmed_oa_*.parquet']) # remove if folder still exist
 
-    path_all = pp.list_xml_path(unzip_dir)
-    if fraction < 1:
-        n_sample = int(fraction * len(path_all))
-        rand_index = random.sample(range(len(path_all)), n_sample)
-        rand_index.sort()
-        path_sample = [path_all[i] for i in rand_index]
-    else:
-        path_sample = path_all
+    # stream articles out of the archive, parsing them over 8 processes, into
+    # gzipped JSON lines so that the driver only holds a few articles at a time
+    json_dir = os.path.join(save_dir, 'pubmed_oa_json_%s' % date_update_str)
+    subprocess.call(['rm', '-rf', json_dir])
+    os.makedirs(json_dir)
+    select = (lambda name: random.random() < fraction) if fraction < 1 else None
+    articles = (dict(article, file_name=os.path.basename(name))
+                for name, article in pp.iter_oa_tarball(tar_path, n_jobs=8, select=select))
+    json_paths = pp.write_records(articles, os.path.join(json_dir, 'pubmed_oa'), output_format='jsonl',
+                                  max_file_size=64 * 1024 ** 2)
 
-    path_rdd = sc.parallelize(path_sample, numSlices=10000) # use only example path
-    parse_results_rdd = path_rdd.map(lambda x: Row(file_name=os.path.basename(x), **pp.parse_pubmed_xml(x)))
-    pubmed_oa_df = parse_results_rdd.toDF()
+    pubmed_oa_df = sqlContext.read.json(json_paths)
+    parse_results_rdd = pubmed_oa_df.rdd
     pubmed_oa_df_sel = pubmed_oa_df[['full_title', 'abstract', 'doi',
                                      'file_name', 'pmc', 'pmid',
                                      'publication_year', 'publisher_id',
@@ -108,6 +105,7 @@ def process_file(date_update, fraction=0.01):
     parse_affil_df = parse_affil_rdd.toDF()
     parse_name_df.write.parquet(os.path.join(save_dir, 'pubmed_oa_affiliation_%s.parquet' % date_update_str),
                                 mode='overwrite')
+    subprocess.call(['rm', '-rf', json_dir])
     print('Finished parsing Pubmed Open-Access subset')
 
 conf = SparkConf().setAppName('pubmed_oa_spark')\
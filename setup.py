@@ -10,8 +10,12 @@ if __name__ == "__main__":
         author='Titipat Achakulvisut',
         author_email='my.titipat@gmail.com',
         license='(c) 2015 Titipat Achakulvisut, Daniel E. Acuna',
-        install_requires=['lxml', 'unidecode', 'requests'],
+        install_requires=['lxml', 'unidecode', 'requests', 'numpy'],
+        extras_require={'index': ['indexed_gzip']},
         packages=['pubmed_parser'],
+        entry_points={
+            'console_scripts': ['pubmed_parser=pubmed_parser.__main__:main'],
+        },
         package_data={
             'pubmed_parser.data': ['*.xml.gz', '*.nxml', '*.txt'],
         }
@@ -0,0 +1,59 @@
+import pytest
+from lxml import etree
+from pubmed_parser import pubmed_oa_parser
+
+
+def _rows(xml, columnar=False):
+    return pubmed_oa_parser._table_rows(etree.fromstring(xml), columnar)
+
+
+def test_rowspan_repeats_cell():
+    columns, rows = _rows('<table><thead><tr><th>A</th><th>B</th></tr></thead><tbody>'
+                          '<tr><td rowspan="2">a</td><td>b1</td></tr>'
+                          '<tr><td>b2</td></tr></tbody></table>')
+    assert columns == ['A', 'B']
+    assert rows == [['a', 'b1'], ['a', 'b2']]
+
+
+def test_colspan_repeats_cell():
+    columns, rows = _rows('<table><thead><tr><th colspan="2">Group</th><th>C</th></tr>'
+                          '<tr><th>x</th><th>y</th><th></th></tr></thead><tbody>'
+                          '<tr><td>1</td><td>2</td><td>3</td></tr></tbody></table>')
+    assert columns == ['Group x', 'Group y', 'C']
+    assert rows == [['1', '2', '3']]
+
+
+def test_rowspan_zero_spans_rest_of_section():
+    _, rows = _rows('<table><tbody><tr><td rowspan="0">a</td><td>1</td></tr>'
+                    '<tr><td>2</td></tr><tr><td>3</td></tr></tbody></table>')
+    assert rows == [['a', '1'], ['a', '2'], ['a', '3']]
+
+
+def test_ragged_rows_are_padded():
+    _, rows = _rows('<table><tbody><tr><td>a</td><td>b</td><td>c</td></tr>'
+                    '<tr><td>x</td></tr></tbody></table>')
+    assert rows == [['a', 'b', 'c'], ['x', '', '']]
+
+
+def test_short_row_under_rowspan_in_last_column():
+    _, rows = _rows('<table><tbody><tr><td>a</td><td>b</td><td rowspan="2">c</td></tr>'
+                    '<tr><td>x</td></tr></tbody></table>')
+    assert rows == [['a', 'b', 'c'], ['x', '', 'c']]
+
+
+def test_empty_row_under_rowspan():
+    _, rows = _rows('<table><tbody><tr><td>a</td><td rowspan="2">b</td></tr>'
+                    '<tr></tr></tbody></table>')
+    assert rows == [['a', 'b'], ['', 'b']]
+
+
+def test_empty_rows_are_dropped():
+    _, rows = _rows('<table><tbody><tr><td>a</td></tr><tr></tr></tbody></table>')
+    assert rows == [['a']]
+    assert _rows('<table><tbody><tr></tr></tbody></table>') == (None, None)
+
+
+def test_columnar():
+    _, columns = _rows('<table><tbody><tr><td>a</td><td>b</td></tr>'
+                       '<tr><td>c</td><td>d</td></tr></tbody></table>', columnar=True)
+    assert columns == [['a', 'c'], ['b', 'd']]
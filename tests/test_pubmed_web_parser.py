@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from pubmed_parser import pubmed_web_parser
+from pubmed_parser.web_client import RateLimiter, WebClient
+
+N_CITATIONS = 35
+
+
+class CitedByHandler(BaseHTTPRequestHandler):
+    """Cited-by pages of PMC100 listing the article itself among its citations"""
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query).get('page', ['1'])[0])
+        pmcs = ['PMC%d' % (1000 + i) for i in range((page - 1) * 30, min(page * 30, N_CITATIONS))]
+        pmcs.insert(1, 'PMC100')
+        rows = ''.join('<div class="rprt"><div class="title"><a href="/pmc/articles/%s/">t</a></div></div>' % p
+                       for p in ['PMC100'] + pmcs)
+        body = ('<html><body><form><h2 class="head">Is Cited by the Following %d Articles '
+                'in this Archive</h2></form>%s</body></html>' % (N_CITATIONS, rows)).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def citedby_server(monkeypatch):
+    server = HTTPServer(('127.0.0.1', 0), CitedByHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = WebClient(rate=1000)
+    monkeypatch.setattr(pubmed_web_parser, 'CITEDBY_URL',
+                        'http://127.0.0.1:%d/pmc/articles/%%s/citedby/' % server.server_address[1])
+    monkeypatch.setattr(pubmed_web_parser, 'get_web_client', lambda: client)
+    monkeypatch.setattr(pubmed_web_parser, 'convert_document_id',
+                        lambda doc_id, id_type='PMC': {'pmc': 'PMC100', 'pmid': '', 'doi': ''})
+    yield
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+ARTICLE_XML = ('<PubmedArticle><MedlineCitation><PMID Version="1">%s</PMID><Article>'
+               '<Journal><Title>Journal %s</Title></Journal><ArticleTitle>Title %s</ArticleTitle>'
+               '<Abstract><AbstractText>Abstract %s</AbstractText></Abstract>'
+               '</Article></MedlineCitation></PubmedArticle>')
+BOOK_XML = ('<PubmedBookArticle><BookDocument><PMID Version="1">%s</PMID>'
+            '<Book><BookTitle>Book %s</BookTitle></Book></BookDocument></PubmedBookArticle>')
+BOOK_PMID = '30'
+MISSING_PMID = '20'
+
+
+def _efetch_body(pmids):
+    """PubmedArticleSet of `pmids` in reverse order, without MISSING_PMID"""
+    articles = [(BOOK_XML % (p, p)) if p == BOOK_PMID else (ARTICLE_XML % (p, p, p, p))
+                for p in reversed(pmids) if p != MISSING_PMID]
+    return ('<?xml version="1.0"?><PubmedArticleSet>%s</PubmedArticleSet>' % ''.join(articles)).encode()
+
+
+class EFetchHandler(BaseHTTPRequestHandler):
+    """EFetch answering GET with one article and POST with a set of articles"""
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(_efetch_body(parse_qs(urlparse(self.path).query)['id']))
+
+    def do_POST(self):
+        data = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        self._send(_efetch_body(data['id'][0].split(',')))
+
+
+@pytest.fixture
+def efetch_server(monkeypatch):
+    server = HTTPServer(('127.0.0.1', 0), EFetchHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = WebClient(rate=1000)
+    monkeypatch.setattr(pubmed_web_parser, 'EFETCH_URL', 'http://127.0.0.1:%d/efetch.fcgi' % server.server_address[1])
+    monkeypatch.setattr(pubmed_web_parser, 'get_web_client', lambda: client)
+    yield
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+def _collect(stream):
+    async def run():
+        return [pair async for pair in stream]
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+def test_amap_completed_yields_errors_and_continues(monkeypatch):
+    def fake_parse_xml_web(pmid, sleep=None, save_xml=False):
+        if pmid == '3':
+            raise ValueError('bad pmid')
+        return {'pmid': pmid}
+
+    monkeypatch.setattr(pubmed_web_parser, 'parse_xml_web', fake_parse_xml_web)
+    pmids = [str(i) for i in range(10)]
+    results = dict(_collect(pubmed_web_parser.aparse_xml_web(pmids, concurrency=2)))
+    assert sorted(results) == sorted(pmids)
+    assert isinstance(results['3'], ValueError)
+    for pmid in pmids:
+        if pmid != '3':
+            assert results[pmid] == {'pmid': pmid}
+
+
+def test_parse_citation_web_drops_self_citation(citedby_server):
+    dict_out = pubmed_web_parser.parse_citation_web('100')
+    assert dict_out['pmc'] == '100'
+    assert dict_out['n_citations'] == N_CITATIONS
+    assert dict_out['pmc_cited'] == [str(1000 + i) for i in range(N_CITATIONS)]
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_iter_citation_web_drops_self_citation(citedby_server, ordered):
+    pmcs = list(pubmed_web_parser.iter_citation_web('100', ordered=ordered))
+    assert sorted(pmcs) == [str(1000 + i) for i in range(N_CITATIONS)]
+
+
+def test_rate_limiter_does_not_burst_above_rate():
+    limiter = RateLimiter(20)
+    start = time.monotonic()
+    times = list()
+    for _ in range(5):
+        limiter.acquire()
+        times.append(time.monotonic() - start)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 0.9 / 20
+
+
+def test_parse_xml_web_batch(efetch_server):
+    pmids = ['10', MISSING_PMID, BOOK_PMID, 40, '50']
+    dicts_out = pubmed_web_parser.parse_xml_web_batch(pmids, batch_size=3)
+    assert len(dicts_out) == len(pmids)
+    assert dicts_out[1] is None
+    assert [d['pmid'] for d in dicts_out if d is not None] == ['10', BOOK_PMID, '40', '50']
+    assert dicts_out[0]['title'] == 'Title 10'
+    assert dicts_out[0]['abstract'] == 'Abstract 10'
+    assert dicts_out[2]['title'] == 'Book 30'
+    single = pubmed_web_parser.parse_xml_web('10')
+    assert dicts_out[0] == single
+    assert all(set(d) == set(single) for d in dicts_out if d is not None)
@@ -0,0 +1,63 @@
+import gzip
+import pytest
+from pubmed_parser.utils import ThreadedGzipReader
+
+XML = b''.join(b'<Article><PMID>%d</PMID></Article>\n' % i for i in range(5000))
+
+
+def _read_all(path, chunk_size):
+    with ThreadedGzipReader(str(path), chunk_size=chunk_size) as f:
+        parts = list()
+        while True:
+            data = f.read(1000)
+            if not data:
+                return b''.join(parts)
+            parts.append(data)
+
+
+def _gzip_read(path):
+    with gzip.open(str(path), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1024, 256 * 1024])
+def test_multiple_members(tmp_path, chunk_size):
+    path = tmp_path / 'members.xml.gz'
+    path.write_bytes(gzip.compress(XML[:50000]) + gzip.compress(XML[50000:]))
+    assert _read_all(path, chunk_size) == _gzip_read(path) == XML
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1024, 256 * 1024])
+def test_trailing_zero_padding(tmp_path, chunk_size):
+    path = tmp_path / 'padded.xml.gz'
+    path.write_bytes(gzip.compress(XML) + b'\x00' * 1000)
+    assert _read_all(path, chunk_size) == _gzip_read(path) == XML
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1024, 256 * 1024])
+def test_padding_between_members(tmp_path, chunk_size):
+    path = tmp_path / 'padded_members.xml.gz'
+    path.write_bytes(gzip.compress(XML[:50000]) + b'\x00' * 10 + gzip.compress(XML[50000:]))
+    assert _read_all(path, chunk_size) == _gzip_read(path) == XML
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1024, 256 * 1024])
+def test_truncated_file_raises(tmp_path, chunk_size):
+    path = tmp_path / 'truncated.xml.gz'
+    data = gzip.compress(XML)
+    path.write_bytes(data[:len(data) // 2])
+    with pytest.raises(EOFError):
+        _gzip_read(path)
+    with pytest.raises(EOFError):
+        _read_all(path, chunk_size)
+
+
+def test_truncated_read_everything_raises(tmp_path):
+    path = tmp_path / 'truncated.xml.gz'
+    data = gzip.compress(XML)
+    path.write_bytes(data[:-4])  # only the size of the trailer is missing
+    with pytest.raises(EOFError):
+        _gzip_read(path)
+    with ThreadedGzipReader(str(path)) as f:
+        with pytest.raises(EOFError):
+            f.read()
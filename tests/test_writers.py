@@ -0,0 +1,36 @@
+import pytest
+from pubmed_parser.writers import ParquetWriter
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def _write_read(tmp_path, records, **kwargs):
+    with ParquetWriter(str(tmp_path / 'out' / 'oa'), **kwargs) as writer:
+        writer.write_many(records)
+    return writer.schema, pq.read_table(writer.paths[0])
+
+
+def test_parquet_empty_lists_in_first_row_group(tmp_path):
+    records = [{'pmc': str(i), 'author_list': [], 'meta': {'tags': []}} for i in range(4)] + \
+              [{'pmc': '4', 'author_list': [['Doe', 'John', 'aff1']], 'meta': {'tags': ['a']}}]
+    schema, table = _write_read(tmp_path, records, row_group_size=2)
+    assert table.to_pylist() == records
+    assert schema.field('author_list').type == pa.list_(pa.list_(pa.string()))
+    assert pq.ParquetFile(str(tmp_path / 'out' / 'oa-00000.parquet')).metadata.num_row_groups == 3
+
+
+def test_parquet_lists_without_values_are_strings(tmp_path):
+    records = [{'pmc': str(i), 'author_list': [], 'meta': {'tags': []}} for i in range(5)]
+    schema, table = _write_read(tmp_path, records, row_group_size=2)
+    assert table.to_pylist() == records
+    assert schema.field('author_list').type == pa.list_(pa.string())
+    assert schema.field('meta').type == pa.struct([('tags', pa.list_(pa.string()))])
+
+
+def test_parquet_infers_from_at_most_max_row_groups(tmp_path):
+    records = [{'pmc': str(i), 'tags': []} for i in range(ParquetWriter.MAX_INFER_ROW_GROUPS * 2)] + \
+              [{'pmc': 'x', 'tags': ['a']}]
+    schema, table = _write_read(tmp_path, records, row_group_size=2)
+    assert table.to_pylist() == records
+    assert schema.field('tags').type == pa.list_(pa.string())